@@ -0,0 +1,133 @@
+# aggregates.py
+# ShopImpact - running monthly aggregates (count / spend / impact, overall and per category)
+
+import numpy as np
+
+SUMMARY_COLUMNS = ["month", "count", "total_spend", "total_impact"]
+
+
+def month_of(day):
+    # "YYYY-MM" for anything np.datetime64 understands (ISO string, date, datetime64)
+    return str(np.datetime64(day, "D").astype("datetime64[M]"))
+
+
+def summary_by_month(df):
+    # batch groupby over a purchases frame; leaves the caller's frame untouched
+    import pandas as pd
+    if df.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    months = pd.to_datetime(df['date']).to_numpy().astype("datetime64[M]")
+    month = pd.Series(np.datetime_as_string(months, unit="M"), index=df.index, name='month')
+    grouped = df.groupby(month).agg(count=('product_name','count'), total_spend=('price','sum'), total_impact=('impact','sum')).reset_index()
+    return grouped.sort_values('month').reset_index(drop=True)
+
+
+class MonthlyAggregates:
+    def __init__(self):
+        # month -> [count, total_spend, total_impact]
+        self.months = {}
+        # month -> {category -> [count, total_spend, total_impact]}
+        self.by_category = {}
+
+    def add(self, month, category, price, impact):
+        row = self.months.get(month)
+        if row is None:
+            row = self.months[month] = [0, 0.0, 0.0]
+            self.by_category[month] = {}
+        row[0] += 1
+        row[1] += price
+        row[2] += impact
+        cat = self.by_category[month].get(category)
+        if cat is None:
+            cat = self.by_category[month][category] = [0, 0.0, 0.0]
+        cat[0] += 1
+        cat[1] += price
+        cat[2] += impact
+
+    def add_many(self, months, categories, prices, impacts, labels=None):
+        # vectorised add for bulk appends: group the batch once, then merge the group sums.
+        # months: "YYYY-MM" strings or datetimes; categories: labels, or integer codes into `labels`
+        months = np.asarray(months).astype("datetime64[M]")
+        if len(months) == 0:
+            return
+        month_keys, month_idx = np.unique(months, return_inverse=True)
+        if labels is None:
+            labels, cat_idx = np.unique(np.asarray(categories).astype(str), return_inverse=True)
+        else:
+            cat_idx = np.asarray(categories)
+        group = month_idx.ravel().astype(np.int64) * len(labels) + cat_idx.ravel()
+        groups, inverse = np.unique(group, return_inverse=True)
+        inverse = inverse.ravel()
+        counts = np.bincount(inverse)
+        spend = np.bincount(inverse, weights=np.asarray(prices, dtype=np.float64))
+        impact = np.bincount(inverse, weights=np.asarray(impacts, dtype=np.float64))
+        for g, n, s, i in zip(groups, counts, spend, impact):
+            month, category = str(month_keys[g // len(labels)]), str(labels[g % len(labels)])
+            row = self.months.setdefault(month, [0, 0.0, 0.0])
+            self.by_category.setdefault(month, {})
+            row[0] += int(n)
+            row[1] += float(s)
+            row[2] += float(i)
+            cat = self.by_category[month].setdefault(category, [0, 0.0, 0.0])
+            cat[0] += int(n)
+            cat[1] += float(s)
+            cat[2] += float(i)
+
+    @classmethod
+    def rebuild(cls, dates, categories, prices, impacts, labels=None):
+        # full recomputation from raw columns (validation / recovery path)
+        agg = cls()
+        agg.add_many(np.asarray(dates, dtype="datetime64[D]"), categories, prices, impacts, labels)
+        return agg
+
+    # ----------------------
+    # Reads
+    # ----------------------
+    def __len__(self):
+        return len(self.months)
+
+    def sorted_months(self):
+        return sorted(self.months)
+
+    def totals(self):
+        count, spend, impact = 0, 0.0, 0.0
+        for n, s, i in self.months.values():
+            count += n
+            spend += s
+            impact += i
+        return count, spend, impact
+
+    def latest(self):
+        # (month, count, total_spend, total_impact) for the most recent month, or None
+        if not self.months:
+            return None
+        month = max(self.months)
+        return (month, *self.months[month])
+
+    def to_frame(self):
+        import pandas as pd
+        rows = [(m, *self.months[m]) for m in self.sorted_months()]
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    def category_frame(self, month):
+        import pandas as pd
+        cats = self.by_category.get(month, {})
+        rows = sorted(((c, *v) for c, v in cats.items()), key=lambda r: -r[3])
+        return pd.DataFrame(rows, columns=["product_type", "count", "total_spend", "total_impact"])
+
+    def matches(self, other, tol=1e-6):
+        if self.months.keys() != other.months.keys():
+            return False
+        for month, row in self.months.items():
+            if not _close(row, other.months[month], tol):
+                return False
+            mine, theirs = self.by_category[month], other.by_category[month]
+            if mine.keys() != theirs.keys():
+                return False
+            if any(not _close(v, theirs[c], tol) for c, v in mine.items()):
+                return False
+        return True
+
+
+def _close(a, b, tol):
+    return a[0] == b[0] and abs(a[1] - b[1]) <= tol and abs(a[2] - b[2]) <= tol
@@ -3,34 +3,33 @@
 # Deploy on Streamlit Cloud (share.streamlit.io) from GitHub - no installs needed locally
 
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from datetime import date
-import io, base64, random
+import os
+import random
 from textwrap import shorten
-import uuid
+
+from brands import load_registry
+from categorizer import load_index
+from charts import ChartCache, monthly_charts
+from cohorts import RANKINGS, RollupRefresher, brand_ranking, category_leaderboard, rollup_months, user_percentile
+from effects import fullscreen_effect_html
+from export import FORMATS, export_bytes, export_filename, export_mime
+from importer import COLUMN_ALIASES, DEBIT_SIGNS, REQUIRED, guess_mapping, import_purchases, peek_columns
+from ledger import COLUMNS, HistoryFilter, PurchaseLedger
+from multipliers import DEFAULT_PROFILE, MULTIPLIERS, ProfileRegistry
+from profiler import NULL_PROFILER, Profiler
+from reports import REPORT_FORMATS, ReportService, report_payload
+from simulator import MIN_HISTORY_MONTHS, simulate
+from storage import StoreError, open_store
+from theme import NEON_THEMES, page_css
 
 st.set_page_config(page_title="ShopImpact", layout="wide", initial_sidebar_state="expanded")
 
 # ----------------------
 # Core configuration
 # ----------------------
-MULTIPLIERS = {
-    "Clothing (Fast Fashion)": 0.12,
-    "Clothing (Sustainable/Second-Hand)": 0.03,
-    "Footwear (Leather)": 0.20,
-    "Footwear (Synthetic)": 0.14,
-    "Electronics": 0.35,
-    "Groceries (Packaged)": 0.08,
-    "Groceries (Fresh/Local)": 0.02,
-    "Personal Care": 0.06,
-    "Furniture": 0.25,
-    "Beverages (Single-Use Bottle)": 0.09,
-    "Books & Stationery": 0.02,
-    "Home Appliances": 0.30,
-    "Other": 0.10
-}
+# sidebar profile used until a visitor names one; shared by all anonymous visitors
+ANONYMOUS = "guest"
 
 SUGGESTIONS = {
     "Clothing (Fast Fashion)": ["Buy second-hand", "Choose organic cotton", "Rent for events"],
@@ -63,53 +62,25 @@ QUOTES = [
     ("Ralph Waldo Emerson", "What lies behind us and what lies before us are tiny matters compared to what lies within us.")
 ]
 
-# different neon palettes per page (animated gradients)
-NEON_THEMES = {
-    "Add Purchase": {
-        "name": "Magenta-Violet",
-        "gradients": [
-            ("#ff007f", "#7c4dff"),
-            ("#ff5f7e", "#8a2be2"),
-            ("#ff007f", "#00e5ff")
-        ],
-        "floating": ["#ff007f","#7c4dff","#00e5ff"]
-    },
-    "Dashboard": {
-        "name": "Electric Green",
-        "gradients": [
-            ("#001f3f", "#004d7a"),
-            ("#39ff14", "#0ff0fc"),
-            ("#00ffaa", "#39ff14")
-        ],
-        "floating": ["#39ff14","#00ffaa","#0ff0fc"]
-    },
-    "History & Export": {
-        "name": "Hot Neon",
-        "gradients": [
-            ("#2b0032", "#6a0572"),
-            ("#ff073a", "#ff6ec7"),
-            ("#ff9b00", "#ff073a")
-        ],
-        "floating": ["#ff073a","#ff6ec7","#ff9b00"]
-    },
-    "Settings & About": {
-        "name": "Calm Neon",
-        "gradients": [
-            ("#011627", "#2f3c7e"),
-            ("#ffd400", "#ff6b6b"),
-            ("#7bffb2", "#ffd400")
-        ],
-        "floating": ["#ffd400","#ff6b6b","#7bffb2"]
-    }
-}
-
 # ----------------------
 # Session state
 # ----------------------
-if "purchases" not in st.session_state:
-    st.session_state.purchases = []
-if "last_pulse_id" not in st.session_state:
-    st.session_state.last_pulse_id = None
+if "ledger" not in st.session_state:
+    st.session_state.ledger = PurchaseLedger()
+    st.session_state.ledger_user = None
+if "pending_writes" not in st.session_state:
+    st.session_state.pending_writes = []
+if "effect_variant" not in st.session_state:
+    st.session_state.effect_variant = None
+
+# rerun profiler - opt-in with SHOPIMPACT_PROFILE=1 (every session) or ?diag=1 (this session); a no-op otherwise
+diagnostics = os.environ.get("SHOPIMPACT_PROFILE") == "1" or st.query_params.get("diag") == "1"
+if not diagnostics:
+    st.session_state.profiler = NULL_PROFILER
+elif not st.session_state.get("profiler", NULL_PROFILER).enabled:
+    st.session_state.profiler = Profiler()
+prof = st.session_state.profiler
+prof.begin_rerun()
 
 # ----------------------
 # Utilities
@@ -117,23 +88,74 @@ if "last_pulse_id" not in st.session_state:
 def calculate_impact(price, multiplier):
     return round(price * multiplier, 2)
 
+@st.cache_resource
+def purchase_store():
+    # one store per server process (backend picked via SHOPIMPACT_STORE, defaults to a local SQLite file)
+    store = open_store()
+    if store.supports_cohorts:
+        # keeps the cross-user rollups behind the Dashboard's Community section up to date
+        RollupRefresher(store).start()
+    return store
+
+@st.cache_resource
+def profile_registry():
+    # multiplier profiles by version + each named profile's active table, saved in the purchase store
+    return ProfileRegistry(purchase_store())
+
+def current_profile():
+    # every anonymous visitor is "guest", so guest multipliers only apply to this browser session
+    if st.session_state.ledger_user == ANONYMOUS:
+        return profile_registry().get(st.session_state.get("guest_multipliers")) or DEFAULT_PROFILE
+    return profile_registry().active_for(st.session_state.ledger_user)
+
+def use_profile(profile):
+    if st.session_state.ledger_user == ANONYMOUS:
+        profile = profile_registry().register(profile)
+        st.session_state.guest_multipliers = profile.version
+        return profile
+    return profile_registry().assign(st.session_state.ledger_user, profile)
+
+def ensure_ledger(user_id):
+    # hydrate the session ledger from the store when the session starts or the profile changes.
+    # every anonymous visitor is "guest", so guest purchases are never stored: they live in this
+    # browser session only (kept aside while a named profile is in use)
+    if st.session_state.ledger_user != user_id:
+        if not flush_purchases():
+            # don't carry unsaved purchases over to the next profile's ledger
+            st.session_state.pending_writes = []
+        if st.session_state.ledger_user == ANONYMOUS:
+            st.session_state.guest_ledger = st.session_state.ledger
+        if user_id == ANONYMOUS:
+            ledger = st.session_state.pop("guest_ledger", None) or PurchaseLedger()
+        else:
+            ledger = PurchaseLedger()
+            rows = purchase_store().query_rows(user_id)
+            if rows:
+                ledger.append_columns(*zip(*rows))
+        st.session_state.ledger = ledger
+        st.session_state.ledger_user = user_id
+
 def add_purchase(entry):
-    st.session_state.purchases.append(entry)
+    st.session_state.ledger.append(entry)
+    if st.session_state.ledger_user != ANONYMOUS:
+        st.session_state.pending_writes.append(entry)
+
+def flush_purchases():
+    # coalesce this rerun's new purchases into a single store transaction; False if they couldn't be saved
+    # (they stay pending and are retried on the next rerun)
+    pending = st.session_state.pending_writes
+    if pending:
+        try:
+            purchase_store().write_many(st.session_state.ledger_user, pending)
+        except StoreError as e:
+            st.error(f"Couldn't save {len(pending)} purchase(s): {e}")
+            return False
+        st.session_state.pending_writes = []
+    return True
 
 def purchases_df():
-    if not st.session_state.purchases:
-        return pd.DataFrame(columns=["date","product_type","product_name","brand","price","impact","eco_brand"])
-    return pd.DataFrame(st.session_state.purchases)
-
-def month_key(dt):
-    return pd.to_datetime(dt).strftime("%Y-%m")
-
-def summary_by_month(df):
-    if df.empty:
-        return pd.DataFrame(columns=["month","count","total_spend","total_impact"])
-    df['month'] = pd.to_datetime(df['date']).apply(lambda d: d.strftime("%Y-%m"))
-    grouped = df.groupby('month').agg(count=('product_name','count'), total_spend=('price','sum'), total_impact=('impact','sum')).reset_index()
-    return grouped.sort_values('month')
+    # cached view shared across the rerun - don't mutate it in place
+    return st.session_state.ledger.frame()
 
 def badge_for_month(impact):
     if impact <= 50:
@@ -144,193 +166,102 @@ def badge_for_month(impact):
         return ("Conscious Shopper — Neon Silver", "Nice effort! You're making progress 🍃")
     return ("Eco Advocate — Neon Gold", "You're conscious — aim for smaller steps too 🌎")
 
-def create_download_csv(df):
-    csv = df.to_csv(index=False).encode('utf-8')
-    b64 = base64.b64encode(csv).decode()
-    href = f"data:file/csv;base64,{b64}"
-    return href
+@st.cache_resource
+def category_index():
+    # keyword index for guessing a category from product name / brand, built once per process
+    return load_index()
+
+@st.cache_resource
+def brand_registry():
+    # canonical brand names, aliases and eco flags from data/brands.csv, built once per process
+    return load_registry()
+
+def suggest_from_product():
+    # on_change for the name / brand inputs: canonical brand spelling, eco flag of known brands, category guess
+    registry = brand_registry()
+    canonical = registry.canonical(st.session_state.ap_brand) if st.session_state.ap_brand else None
+    if canonical is not None:
+        st.session_state.ap_brand = canonical
+        st.session_state.ap_eco = registry.is_eco(canonical)
+    category, _ = category_index().categorize(st.session_state.ap_name, st.session_state.ap_brand)
+    st.session_state.ap_suggested = category
+    if category is not None:
+        st.session_state.ap_prod = category
+
+def pick_brand(name):
+    st.session_state.ap_brand = name
+    suggest_from_product()
+
+@st.cache_resource
+def chart_cache():
+    # rendered chart PNGs shared by all sessions, LRU-evicted
+    return ChartCache(max_items=64)
+
+@st.cache_resource
+def report_service():
+    # PDF / PNG reports rendered in worker processes, shared by all sessions
+    return ReportService()
+
+@st.fragment(run_every=1.0)
+def report_progress(key):
+    # polls the report service once a second; the full rerun shows the finished report
+    status, elapsed = report_service().poll(key)
+    if status == "running":
+        st.caption(f"Rendering report… {elapsed:.0f}s")
+    else:
+        st.rerun()
 
 def sample_quote():
     return random.choice(QUOTES)
 
-# ----------------------
-# CSS: full-screen animated backgrounds, subtle fade-in transitions, full-screen pulse & floats
-# ----------------------
-def page_css(theme_name):
-    theme = NEON_THEMES.get(theme_name, list(NEON_THEMES.values())[0])
-    # create gradient sequence for CSS animation
-    grads = theme['gradients']
-    # prepare stops
-    gradients_css = ", ".join([f"linear-gradient(120deg, {g[0]}, {g[1]})" for g in grads])
-    # create keyframe steps using the colors
-    kf = ""
-    steps = len(grads)
-    for i, g in enumerate(grads):
-        pct = int((i/(steps-1))*100) if steps>1 else 100
-        kf += f"{pct}% {{ background: linear-gradient(120deg, {g[0]}, {g[1]}); }}\n"
-    css = f"""
-    <style>
-    /* make Streamlit main app full-bleed and remove default padding */
-    .stApp {{
-      padding: 0 !important;
-      margin: 0 !important;
-    }}
-    /* top-level page container fills viewport */
-    .page-wrap {{
-      min-height: 100vh;
-      width: 100%;
-      position: relative;
-      overflow: auto;
-      display: flex;
-      flex-direction: column;
-      z-index: 1;
-    }}
-    /* animated neon background layer (full-screen) */
-    .neon-bg {{
-      position: fixed;
-      inset: 0;
-      z-index: 0;
-      filter: contrast(1.05) saturate(1.2);
-      background: linear-gradient(120deg, {grads[0][0]}, {grads[0][1]});
-      background-size: 400% 400%;
-      animation: neonBackground 18s linear infinite;
-      opacity: 0.95;
-      pointer-events: none;
-    }}
-    @keyframes neonBackground {{
-      0% {{ background: linear-gradient(120deg, {grads[0][0]}, {grads[0][1]}); }}
-      33% {{ background: linear-gradient(120deg, {grads[1%len(grads)][0]}, {grads[1%len(grads)][1]}); }}
-      66% {{ background: linear-gradient(120deg, {grads[(2)%len(grads)][0]}, {grads[(2)%len(grads)][1]}); }}
-      100% {{ background: linear-gradient(120deg, {grads[0][0]}, {grads[0][1]}); }}
-    }}
-
-    /* subtle fade-in when page loads */
-    .page-content {{
-      position: relative;
-      z-index: 2;
-      padding: 28px 40px;
-      animation: pageFade 0.9s ease-in-out both;
-    }}
-    @keyframes pageFade {{
-      0% {{ opacity: 0; transform: translateY(10px); filter: blur(3px); }}
-      100% {{ opacity: 1; transform: translateY(0); filter: blur(0); }}
-    }}
-
-    /* full-screen pulse overlay used on add */
-    .neon-pulse-full {{
-      position: fixed;
-      inset: 0;
-      z-index: 3;
-      display: none;
-      pointer-events: none;
-      mix-blend-mode: screen;
-    }}
-    .neon-pulse-full.active {{
-      display: block;
-      animation: fullPulse 1s ease-out 1;
-      background: radial-gradient(circle at 50% 40%, rgba(255,255,255,0.06), rgba(255,255,255,0) 20%),
-                  radial-gradient(circle at 10% 80%, rgba(255,255,255,0.02), rgba(255,255,255,0) 10%);
-    }}
-    @keyframes fullPulse {{
-      0% {{ opacity: 0; filter: blur(0); transform: scale(1); }}
-      30% {{ opacity: 1; filter: blur(6px); transform: scale(1.015); }}
-      100% {{ opacity: 0; filter: blur(0); transform: scale(1); }}
-    }}
-
-    /* floating icons across full viewport */
-    .float-layer {{
-      position: fixed;
-      inset: 0;
-      z-index: 4;
-      pointer-events: none;
-      overflow: visible;
-    }}
-    .float-item {{
-      position: absolute;
-      font-size: 36px;
-      text-shadow: 0 6px 18px rgba(0,0,0,0.6);
-      animation: floatUpViewport 4.5s linear forwards;
-      will-change: transform, opacity;
-    }}
-    @keyframes floatUpViewport {{
-      0% {{ transform: translateY(40vh) scale(0.9); opacity: 1; }}
-      100% {{ transform: translateY(-30vh) scale(1.1); opacity: 0; }}
-    }}
-
-    /* basic card styling on top content to keep text readable */
-    .card {{
-      background: rgba(0,0,0,0.22);
-      border-radius: 12px;
-      padding: 16px;
-      border: 1px solid rgba(255,255,255,0.06);
-      box-shadow: 0 8px 30px rgba(0,0,0,0.45);
-      color: white;
-    }}
-    .title {{
-      font-size: 40px;
-      font-weight: 900;
-      color: white;
-      text-shadow: 0 0 14px rgba(255,255,255,0.06);
-    }}
-    .subtitle {{
-      font-size: 16px;
-      color: rgba(255,255,255,0.9);
-      margin-bottom: 8px;
-    }}
-    .big-input {{ font-size:18px; padding:10px; border-radius:8px; border:1px solid rgba(255,255,255,0.08); background: rgba(255,255,255,0.02); color: #fff; width:100%; }}
-    .big-button {{ font-size:18px; padding:10px 18px; border-radius:10px; border:none; cursor:pointer; background: rgba(255,255,255,0.96); color: #111; font-weight:700; box-shadow: 0 10px 30px rgba(0,0,0,0.45); }}
-    /* small responsive tweaks */
-    @media (max-width: 800px) {{
-      .page-content {{ padding: 18px 14px; }}
-      .title {{ font-size: 32px; }}
-      .float-item {{ font-size: 26px; }}
-    }}
-    </style>
-    """
-    return css
+def markdown(body, container=st, channel="markdown", **kwargs):
+    # st.markdown that reports the payload size to the rerun profiler
+    prof.add_text(channel, body)
+    return container.markdown(body, **kwargs)
+
+def dataframe(df, **kwargs):
+    prof.add_frame("dataframe", df)
+    return st.dataframe(df, **kwargs)
 
 # ----------------------
 # Helper to spawn full-screen floats and pulse HTML
 # ----------------------
 def render_fullscreen_effect(theme_name, intensity=14):
-    theme = NEON_THEMES.get(theme_name)
-    colors = theme['floating']
-    # unique id to avoid caching issues
-    uid = uuid.uuid4().hex[:8]
-    floats_html = f"<div id='floatlayer_{uid}' class='float-layer'>"
-    icons = ["🌱","💚","🌿","🌎","✨","💫","🪴","⚡","🌸"]
-    for i in range(intensity):
-        ico = random.choice(icons)
-        left = random.randint(2,92)
-        delay = round(random.random()*0.8,2)
-        dur = round(3.6 + random.random()*1.6,2)
-        color = random.choice(colors)
-        size = random.randint(28,52)
-        floats_html += f"<div class='float-item' style='left:{left}%; bottom:10vh; animation-delay:{delay}s; animation-duration:{dur}s; color:{color}; font-size:{size}px'>{ico}</div>"
-    floats_html += "</div>"
-    pulse_html = f"<div id='pulse_{uid}' class='neon-pulse-full active'></div>"
-    st.markdown(floats_html + pulse_html, unsafe_allow_html=True)
-    # store last pulse id so we can manage re-runs if needed
-    st.session_state.last_pulse_id = uid
+    # a pooled variant, never the one this session saw last (the same markup would not replay)
+    variant, html = fullscreen_effect_html(theme_name, intensity, previous=st.session_state.effect_variant,
+                                           reduced=st.session_state.get("reduced_motion", False))
+    if html:
+        markdown(html, channel="effects", unsafe_allow_html=True)
+        st.session_state.effect_variant = variant
 
 # ----------------------
 # Layout & navigation
 # ----------------------
-st.markdown(page_css("Add Purchase"), unsafe_allow_html=True)  # inject CSS (themes will animate; CSS uses the gradients defined)
-st.markdown("<div class='neon-bg'></div>", unsafe_allow_html=True)  # background layer (CSS animates)
-
 # Sidebar & header
-st.sidebar.markdown("# 🔮 ShopImpact")
-page = st.sidebar.radio("Navigate:", ["Add Purchase", "Dashboard", "History & Export", "Settings & About"])
-q_src, q_text = sample_quote()
-st.sidebar.markdown(f"**Quote:** _{shorten(q_text, width=100)}_ — *{q_src}*")
+with prof.span("sidebar"):
+    markdown("# 🔮 ShopImpact", container=st.sidebar)
+    page = st.sidebar.radio("Navigate:", ["Add Purchase", "Dashboard", "History & Export", "Settings & About"])
+    user_id = st.sidebar.text_input("Profile", value=ANONYMOUS, max_chars=40, key="user_id",
+                                    help=f"Purchases are saved under a profile name; as \"{ANONYMOUS}\" they last for this browser session only").strip() or ANONYMOUS
+    reduced_motion = st.sidebar.toggle("Reduced motion", key="reduced_motion",
+                                       help="Still background, no add-purchase animation - also less data on slow connections")
+with prof.span("load_ledger"):
+    ensure_ledger(user_id)
+
+# inject the current page's precompiled theme CSS exactly once per rerun
+with prof.span("theme_css"):
+    markdown(page_css(page, reduced_motion), channel="css", unsafe_allow_html=True)
+markdown("<div class='neon-bg'></div>", unsafe_allow_html=True)  # background layer (CSS animates)
+with prof.span("sidebar_quote"):
+    q_src, q_text = sample_quote()
+    markdown(f"**Quote:** _{shorten(q_text, width=100)}_ — *{q_src}*", container=st.sidebar)
 
 # page wrapper
-st.markdown("<div class='page-wrap'>", unsafe_allow_html=True)
-st.markdown("<div class='page-content'>", unsafe_allow_html=True)
+markdown("<div class='page-wrap'>", unsafe_allow_html=True)
+markdown("<div class='page-content'>", unsafe_allow_html=True)
 
 # header area
-st.markdown("<div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:16px'>"
+markdown("<div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:16px'>"
             "<div><div class='title'>ShopImpact</div><div class='subtitle'>Conscious shopping made colourful</div></div>"
             "<div style='text-align:right'><img src='https://upload.wikimedia.org/wikipedia/commons/thumb/9/97/Emoji_u1f331.svg/512px-Emoji_u1f331.svg.png' width='56' /></div>"
             "</div>", unsafe_allow_html=True)
@@ -338,157 +269,334 @@ st.markdown("<div style='display:flex;justify-content:space-between;align-items:
 # ----------------------
 # PAGE: Add Purchase (big full-screen neon page)
 # ----------------------
+page_timer = prof.start(f"page:{page}")
+if page != "History & Export":
+    # a prepared export is only kept while its page is open
+    st.session_state.pop("export", None)
 if page == "Add Purchase":
-    # Add Purchase uses its own theme - re-inject CSS so neon-bg uses Add Purchase palette
-    st.markdown(page_css("Add Purchase"), unsafe_allow_html=True)
-    st.markdown(f"<div class='card' style='margin-bottom:20px'>"
+    markdown(f"<div class='card' style='margin-bottom:20px'>"
                 f"<div style='display:flex;justify-content:space-between;align-items:center'>"
                 f"<div style='font-size:28px;font-weight:800'>Add Purchase — Big Stage</div>"
                 f"<div style='font-size:14px;color:rgba(255,255,255,0.85)'>Theme: {NEON_THEMES['Add Purchase']['name']}</div>"
                 f"</div></div>", unsafe_allow_html=True)
 
+    # name and brand live outside the form so typing them can prefill the category
+    n1, n2 = st.columns([2,1])
+    product_name = n1.text_input("Product name", max_chars=80, key="ap_name", placeholder="e.g. Running Shoes / Cotton T-Shirt",
+                                 on_change=suggest_from_product)
+    brand = n2.text_input("Brand (required)", max_chars=60, key="ap_brand", placeholder="Type the brand name (required)",
+                          on_change=suggest_from_product)
+    if brand and brand_registry().canonical(brand) is None:
+        # unknown spelling: offer known brands starting with what was typed
+        matches = brand_registry().complete(brand, limit=5)
+        if matches:
+            pick_cols = n2.columns(len(matches))
+            for col, name in zip(pick_cols, matches):
+                col.button(name, key=f"ap_pick_{name}", on_click=pick_brand, args=(name,))
     with st.form("big_purchase_form", clear_on_submit=False):
         c1, c2 = st.columns([2,1])
         with c1:
             product_type = st.selectbox("Product category", options=list(MULTIPLIERS.keys()), key="ap_prod")
-            product_name = st.text_input("Product name", max_chars=80, key="ap_name", placeholder="e.g. Running Shoes / Cotton T-Shirt")
-            brand = st.text_input("Brand (required)", max_chars=60, key="ap_brand", placeholder="Type the brand name (required)")
+            if st.session_state.get("ap_suggested"):
+                st.caption(f"Suggested from the name / brand: {st.session_state.ap_suggested}")
             price = st.number_input("Price", min_value=0.0, step=0.5, format="%.2f", key="ap_price")
             pd_date = st.date_input("Purchase date", value=date.today(), key="ap_date")
-            eco_brand = st.checkbox("Eco / ethical brand", key="ap_eco")
-        with c2:
-            st.markdown("### Inspirations & Quotes")
+            eco_brand = st.checkbox("Eco / ethical brand", key="ap_eco", help="Ticked automatically for brands known to be eco / ethical")
+        with c2, prof.span("quotes"):
+            markdown("### Inspirations & Quotes")
             qlist = random.sample(QUOTES, k=4 if len(QUOTES)>=4 else len(QUOTES))
             for qsrc, qtxt in qlist:
-                st.markdown(f"> _{shorten(qtxt, width=110)}_ — *{qsrc}*")
-            st.markdown("---")
-            st.markdown("### Suggestions")
+                markdown(f"> _{shorten(qtxt, width=110)}_ — *{qsrc}*")
+            markdown("---")
+            markdown("### Suggestions")
             for s in SUGGESTIONS.get(product_type, ["Consider lower-impact choices"]):
-                st.markdown(f"- {s}")
+                markdown(f"- {s}")
         submitted = st.form_submit_button("Add purchase ✨")
 
     if submitted:
         if not brand or brand.strip() == "":
             st.error("Brand is required. Please type the brand name to add your purchase.")
         else:
-            multiplier = MULTIPLIERS.get(product_type, MULTIPLIERS["Other"])
+            profile = current_profile()
+            multiplier = profile.get(product_type)
             impact = calculate_impact(price, multiplier)
             entry = {
                 "date": pd_date.isoformat(),
                 "product_type": product_type,
                 "product_name": product_name if product_name else "—",
-                "brand": brand.strip(),
+                "brand": brand_registry().canonicalize(brand),
                 "price": float(price),
                 "impact": float(impact),
-                "eco_brand": bool(eco_brand)
+                "eco_brand": bool(eco_brand),
+                "multiplier_version": profile.version
             }
             add_purchase(entry)
             st.success(f"Added: {product_type} — estimated impact ≈ {impact} CO₂ units")
             st.info("Suggestion: " + " · ".join(SUGGESTIONS.get(product_type, ["Consider lower-impact choices"])))
+            what_if = simulate(st.session_state.ledger, profile)
+            best = what_if.top(1, category=product_type) if what_if.enough_history else []
+            if best:
+                scenario, saving, low, high = best[0]
+                st.caption(f"What if: {scenario.name} — about {saving:.0f} CO₂ units less a year ({low:.0f}–{high:.0f})")
             # render full screen pulse + floats
             render_fullscreen_effect("Add Purchase", intensity=18)
             # show badge text
             if eco_brand or multiplier <= 0.03:
-                st.markdown("<h3 style='color:#fff'>NEON ECO BADGE 🌿 — Great choice!</h3>", unsafe_allow_html=True)
+                markdown("<h3 style='color:#fff'>NEON ECO BADGE 🌿 — Great choice!</h3>", unsafe_allow_html=True)
             else:
                 if impact < 10:
-                    st.markdown("<h3 style='color:#fff'>Small footprint — Nice!</h3>", unsafe_allow_html=True)
+                    markdown("<h3 style='color:#fff'>Small footprint — Nice!</h3>", unsafe_allow_html=True)
+                else:
+                    markdown("<h3 style='color:#fff'>Consider greener options ✨</h3>", unsafe_allow_html=True)
+
+    with st.expander("Bulk import — bank or receipt export (CSV / JSONL)"):
+        upload = st.file_uploader("Transactions file", type=["csv", "jsonl", "json"], key="bulk_file")
+        if upload is not None:
+            bulk_fmt = "jsonl" if upload.name.lower().endswith((".jsonl", ".json")) else "csv"
+            source_cols = peek_columns(upload, bulk_fmt)
+            guessed = guess_mapping(source_cols)
+            st.caption("Match your file's columns to purchase fields (* required). Missing or unknown categories are "
+                       "guessed from the product name and brand, or count as Other.")
+            mapping = {}
+            map_cols = st.columns(3)
+            for i, field in enumerate(COLUMN_ALIASES):
+                options = ["—"] + source_cols
+                choice = map_cols[i % 3].selectbox(field + (" *" if field in REQUIRED else ""), options=options,
+                                                   index=options.index(guessed[field]) if field in guessed else 0, key=f"bulk_map_{field}")
+                if choice != "—":
+                    mapping[field] = choice
+            o1, o2 = st.columns(2)
+            bulk_dayfirst = o1.checkbox("Day-first dates (DD/MM/YYYY)", key="bulk_dayfirst",
+                                        help="ISO dates (2024-03-05) are always read as year-month-day")
+            bulk_debits = o2.radio("Purchases are booked as", DEBIT_SIGNS, key="bulk_debits", horizontal=True,
+                                   format_func=lambda sign: {"positive": "positive amounts (receipts)",
+                                                             "negative": "negative amounts (bank debits)"}[sign],
+                                   help="Rows with the other sign (refunds, salary, transfers in) are skipped")
+            if st.button("Import purchases"):
+                bar = st.progress(0.0)
+                def show_progress(fraction, rows_read):
+                    bar.progress(fraction if fraction is not None else 0.0, text=f"{rows_read:,} rows read")
+                try:
+                    with prof.span("bulk_import"):
+                        result = import_purchases(st.session_state.ledger, upload, current_profile(), fmt=bulk_fmt, mapping=mapping,
+                                                  progress=show_progress,
+                                                  persist=None if st.session_state.ledger_user == ANONYMOUS else
+                                                  lambda rows: purchase_store().write_rows(st.session_state.ledger_user, rows),
+                                                  categorizer=category_index(), brands=brand_registry(),
+                                                  dayfirst=bulk_dayfirst, debits=bulk_debits)
+                except (ValueError, StoreError) as e:
+                    st.error(f"Import failed: {e}")
                 else:
-                    st.markdown("<h3 style='color:#fff'>Consider greener options ✨</h3>", unsafe_allow_html=True)
+                    bar.progress(1.0, text=f"{result.rows_read:,} rows read")
+                    st.success(f"Imported {result.rows_added:,} of {result.rows_read:,} rows in {result.seconds:.1f}s")
+                    if result.error_count:
+                        st.warning(f"{result.error_count:,} rows skipped — first {len(result.errors)} listed below")
+                        dataframe(result.errors_frame(), use_container_width=True)
 
 # ----------------------
 # PAGE: Dashboard
 # ----------------------
 elif page == "Dashboard":
-    st.markdown(page_css("Dashboard"), unsafe_allow_html=True)
-    st.markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>Dashboard — {NEON_THEMES['Dashboard']['name']}</div>"
+    markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>Dashboard — {NEON_THEMES['Dashboard']['name']}</div>"
                 f"<div style='font-size:13px;color:rgba(255,255,255,0.85)'>Monthly summaries, badges & charts</div></div>", unsafe_allow_html=True)
-    df = purchases_df()
-    if df.empty:
+    ledger = st.session_state.ledger
+    monthly = ledger.monthly
+    profile = current_profile()
+    if set(ledger.recorded_versions()) - {profile.version}:
+        # purchases logged under other multipliers: optionally view everything under the active profile
+        if st.checkbox(f"Recalculate all impacts with the active multipliers ({profile.name}, {profile.version})"):
+            monthly = ledger.monthly_under(profile)
+    if not len(monthly):
         st.warning("No purchases yet — use Add Purchase to start logging items.")
     else:
-        total_spend = df['price'].sum()
-        total_impact = df['impact'].sum()
-        total_count = len(df)
+        # running aggregates, updated by add_purchase - no pass over the purchases here
+        total_count, total_spend, total_impact = monthly.totals()
         c1,c2,c3,c4 = st.columns(4)
         c1.metric("Total spend", f"{total_spend:.2f}")
         c2.metric("Total purchases", f"{total_count}")
         c3.metric("Total estimated CO₂", f"{total_impact:.2f}")
         c4.metric("Avg impact/item", f"{(total_impact/total_count if total_count else 0):.2f}")
 
-        summary = summary_by_month(df)
-        st.markdown("### Monthly summary")
-        st.dataframe(summary, use_container_width=True)
+        with prof.span("summary_by_month"):
+            summary = monthly.to_frame()
+        markdown("### Monthly summary")
+        dataframe(summary, use_container_width=True)
 
-        st.markdown("### Visualisations")
-        fig1, ax1 = plt.subplots(figsize=(8,3))
-        ax1.bar(summary['month'], summary['total_spend'], color="#39ff14")
-        ax1.set_title("Monthly Spend")
-        plt.xticks(rotation=45)
-        st.pyplot(fig1)
-
-        fig2, ax2 = plt.subplots(figsize=(8,3))
-        ax2.plot(summary['month'], summary['total_impact'], marker='o', color="#0ff0fc")
-        ax2.set_title("Monthly CO₂ Impact")
-        plt.xticks(rotation=45)
-        st.pyplot(fig2)
+        markdown("### Visualisations")
+        if st.checkbox("Lightweight charts", value=False, help="Use Streamlit's native charts instead of rendered images"):
+            chart_data = summary.set_index('month')
+            st.bar_chart(chart_data['total_spend'])
+            st.line_chart(chart_data['total_impact'])
+        else:
+            # images are cached on (summary data, theme); matplotlib only runs when they change
+            with prof.span("charts"):
+                spend_png, impact_png = monthly_charts(chart_cache(), summary, page)
+            st.image(spend_png)
+            st.image(impact_png)
 
-        latest = summary.iloc[-1] if not summary.empty else None
+        latest = monthly.latest()
         if latest is not None:
-            badge, msg = badge_for_month(latest['total_impact'])
-            st.markdown(f"### Badge for {latest['month']}: **{badge}**")
-            st.markdown(f"> {msg}")
+            latest_month, _, _, latest_impact = latest
+            badge, msg = badge_for_month(latest_impact)
+            markdown(f"### Badge for {latest_month}: **{badge}**")
+            markdown(f"> {msg}")
+
+        # substitution / reduction scenarios over the last year's spend, memoised per ledger version
+        markdown("### What if… biggest savings")
+        with prof.span("what_if"):
+            what_if = simulate(ledger, profile)
+            best = what_if.top(5) if what_if.enough_history else []
+        if not what_if.enough_history:
+            st.caption(f"Yearly projections start once your purchases span {MIN_HISTORY_MONTHS} months "
+                       f"(so far: {what_if.history_months}).")
+        elif not best:
+            st.caption("No lower-impact swaps to suggest for these purchases yet.")
+        else:
+            st.caption(f"Based on your last {what_if.history_months} months of purchases: about {what_if.annual_impact:.0f} CO₂ units a year "
+                       f"({what_if.annual_low:.0f}–{what_if.annual_high:.0f} allowing for multiplier uncertainty)")
+            dataframe([{"scenario": sc.name, "CO₂ saved / year": round(saving, 1), "range": f"{low:.0f}–{high:.0f}",
+                        "share": f"{saving / what_if.annual_impact:.0%}"} for sc, saving, low, high in best],
+                      use_container_width=True, hide_index=True)
+            chosen = st.selectbox("Replay a scenario over past months", [sc.name for sc, *_ in best], key="what_if")
+            baseline, projected = what_if.monthly(next(sc for sc, *_ in best if sc.name == chosen))
+            st.line_chart(summary[["month"]].assign(current=baseline, **{"with scenario": projected}).set_index("month"))
+
+    store = purchase_store()
+    if store.supports_cohorts:
+        # cross-user views, answered from the rollup tables only - never from the raw purchases
+        markdown("### Community")
+        with prof.span("cohorts"):
+            cohort_months = store.cohort_query(rollup_months)
+            if not cohort_months:
+                st.caption("Community rankings appear once purchases have been rolled up (every 30 seconds or so).")
+            else:
+                own_latest = monthly.latest()
+                # guest purchases aren't stored, so only named profiles have a place in the rollups
+                named = st.session_state.ledger_user != ANONYMOUS
+                rank = store.cohort_query(user_percentile, st.session_state.ledger_user, own_latest[0]) if named and own_latest else None
+                if rank is not None:
+                    share, shoppers = rank
+                    st.metric(f"Your CO₂ in {own_latest[0]} is lower than", f"{share:.0%} of shoppers",
+                              help=f"{shoppers} shoppers logged purchases that month")
+                k1, k2 = st.columns(2)
+                cohort_month = k1.selectbox("Month", ["All time"] + cohort_months[::-1], key="cohort_month")
+                brand_order = k2.selectbox("Rank brands by", list(RANKINGS), key="cohort_rank")
+                month = None if cohort_month == "All time" else cohort_month
+                l1, l2 = st.columns(2)
+                with l1:
+                    markdown("#### Category leaderboard")
+                    dataframe([{"category": c, "purchases": n, "spend": round(sp, 2), "CO₂": round(co2, 2)}
+                               for c, n, sp, co2 in store.cohort_query(category_leaderboard, month)],
+                              use_container_width=True, hide_index=True)
+                with l2:
+                    markdown("#### Brand ranking")
+                    registry = brand_registry()
+                    dataframe([{"brand": b, "eco": "🌿" if registry.is_eco(b) else "", "purchases": n, "spend": round(sp, 2),
+                                "CO₂": round(co2, 2), "CO₂ per spend": round(per or 0.0, 4)}
+                               for b, n, sp, co2, per in store.cohort_query(brand_ranking, month, brand_order)],
+                              use_container_width=True, hide_index=True)
 
 # ----------------------
 # PAGE: History & Export
 # ----------------------
 elif page == "History & Export":
-    st.markdown(page_css("History & Export"), unsafe_allow_html=True)
-    st.markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>History & Export — {NEON_THEMES['History & Export']['name']}</div>"
+    markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>History & Export — {NEON_THEMES['History & Export']['name']}</div>"
                 f"<div style='font-size:13px;color:rgba(255,255,255,0.85)'>Filter, download CSV, and quick reports</div></div>", unsafe_allow_html=True)
-    df = purchases_df()
-    if df.empty:
+    ledger = st.session_state.ledger
+    if not len(ledger):
         st.info("No purchases yet.")
     else:
-        st.dataframe(df, use_container_width=True)
-        months = sorted(list({month_key(r['date']) for r in st.session_state.purchases}), reverse=True)
-        sel_month = st.selectbox("Select month (or 'All')", options=["All"] + months)
-        sel_cat = st.selectbox("Select category (or 'All')", options=["All"] + list(MULTIPLIERS.keys()))
-        filtered = df.copy()
-        if sel_month != "All":
-            filtered = filtered[filtered['date'].apply(lambda d: month_key(d)==sel_month)]
-        if sel_cat != "All":
-            filtered = filtered[filtered['product_type']==sel_cat]
-        st.dataframe(filtered, use_container_width=True)
-
-        csv = filtered.to_csv(index=False).encode()
-        st.download_button("Download filtered CSV", data=csv, file_name="shopimpact_history.csv", mime="text/csv")
-        href = create_download_csv(filtered)
-        st.markdown(f"[Direct CSV export]({href})")
-
-        st.markdown("#### Create Quick Visual Report")
-        if st.button("Create Report Image"):
-            fig, ax = plt.subplots(figsize=(8,6))
-            ax.axis('off')
-            text = f"ShopImpact Quick Report\\n\\nTotal items: {len(filtered)}\\nTotal spend: {filtered['price'].sum():.2f}\\nTotal impact: {filtered['impact'].sum():.2f}\\n\\nTop categories:\\n"
-            topcats = filtered.groupby('product_type').agg(total_impact=('impact','sum')).reset_index().sort_values('total_impact', ascending=False).head(3)
-            for i,row in topcats.iterrows():
-                text += f" - {row['product_type']}: {row['total_impact']:.2f}\\n"
-            ax.text(0,0.9, text, fontsize=12, family='monospace')
-            buf = io.BytesIO()
-            plt.savefig(buf, format="png", bbox_inches='tight')
-            buf.seek(0)
-            st.image(buf)
-            st.download_button("Download report image", data=buf, file_name="shopimpact_report.png")
+        # month options come from the aggregate index, not from a pass over the rows
+        months = ledger.monthly.sorted_months()[::-1]
+        f1, f2 = st.columns(2)
+        sel_month = f1.selectbox("Select month (or 'All')", options=["All"] + months)
+        sel_cat = f2.selectbox("Select category (or 'All')", options=["All"] + list(MULTIPLIERS.keys()))
+        with st.expander("More filters"):
+            dates, prices = ledger.column("date"), ledger.column("price")
+            first_day, last_day = dates.min().item(), dates.max().item()
+            date_range = st.date_input("Date range", value=(first_day, last_day), min_value=first_day, max_value=last_day)
+            sel_brands = st.multiselect("Brands", options=sorted(ledger.categories["brand"]))
+            low, high = float(prices.min()), float(prices.max())
+            price_range = st.slider("Price range", min_value=low, max_value=high, value=(low, high)) if high > low else (low, high)
+            sel_eco = st.radio("Eco / ethical brand", ["All", "Eco only", "Non-eco only"], horizontal=True)
+        flt = HistoryFilter(
+            month=None if sel_month == "All" else sel_month,
+            category=None if sel_cat == "All" else sel_cat,
+            start=date_range[0] if len(date_range) > 0 and date_range[0] != first_day else None,
+            end=date_range[1] if len(date_range) > 1 and date_range[1] != last_day else None,
+            brands=tuple(sel_brands),
+            min_price=price_range[0] if price_range[0] > low else None,
+            max_price=price_range[1] if price_range[1] < high else None,
+            eco={"All": None, "Eco only": True, "Non-eco only": False}[sel_eco],
+        )
+        # totals come from the ledger aggregates; only the visible page is sent to the browser
+        match_count, match_spend, match_impact = ledger.summarize(flt)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Matching purchases", f"{match_count}")
+        m2.metric("Spend", f"{match_spend:.2f}")
+        m3.metric("Estimated CO₂", f"{match_impact:.2f}")
+
+        p1, p2, p3, p4 = st.columns(4)
+        sort_by = p1.selectbox("Sort by", options=COLUMNS, index=0)
+        descending = p2.selectbox("Order", options=["Descending", "Ascending"]) == "Descending"
+        page_size = p3.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
+        page_count = max(1, -(-match_count // page_size))
+        page_no = p4.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+        offset = (int(page_no) - 1) * page_size
+        dataframe(ledger.page(flt, sort_by, not descending, offset, page_size), use_container_width=True)
+        st.caption(f"Showing {min(offset + 1, match_count)}–{min(offset + page_size, match_count)} of {match_count}")
+
+        # export bytes are only built when asked for, and dropped as soon as the filter, format or data changes
+        markdown("#### Export")
+        e1, e2, e3 = st.columns(3)
+        export_fmt = e1.selectbox("Format", options=list(FORMATS))
+        export_gzip = e2.checkbox("gzip", value=False)
+        export_key = (st.session_state.ledger_user, ledger.version, flt, sort_by, descending, export_fmt, export_gzip)
+        cached_export = st.session_state.get("export")
+        if cached_export is not None and cached_export[0] != export_key:
+            del st.session_state.export
+            cached_export = None
+        if cached_export is None and e3.button("Prepare export"):
+            with prof.span("export"):
+                rows = ledger.sorted_rows(flt, sort_by, not descending)
+                cached_export = st.session_state.export = (export_key, export_bytes(ledger, rows, export_fmt, export_gzip))
+        if cached_export is not None:
+            st.download_button(f"Download filtered {export_fmt.upper()}", data=cached_export[1],
+                               file_name=export_filename("shopimpact_history", export_fmt, export_gzip),
+                               mime=export_mime(export_fmt, export_gzip))
+
+        # reports render in a worker process; this rerun only builds the (small) payload and submits it
+        markdown("#### Report")
+        r1, r2 = st.columns(2)
+        report_fmt = r1.selectbox("Report format", options=list(REPORT_FORMATS), format_func=str.upper)
+        report_filter = (st.session_state.ledger_user, ledger.version, flt, report_fmt)
+        report_job = st.session_state.get("report")
+        report_status, report_value = report_service().poll(report_job[1]) if report_job else (None, None)
+        if report_job is None or report_job[0] != report_filter or report_status in (None, "failed"):
+            if r2.button("Create report", help="Summary, monthly charts, top categories and badges"):
+                with prof.span("report"):
+                    payload = report_payload(ledger, flt, badge_for_month)
+                    report_job = st.session_state.report = (report_filter, report_service().submit(payload, report_fmt))
+                report_status, report_value = report_service().poll(report_job[1])
+        if report_job is not None and report_job[0] == report_filter:
+            if report_status == "running":
+                report_progress(report_job[1])
+            elif report_status == "failed":
+                st.error(f"Report failed: {report_value}")
+            elif report_status == "done":
+                if report_fmt == "png":
+                    st.image(report_value)
+                mime, ext = REPORT_FORMATS[report_fmt]
+                st.download_button(f"Download report {ext.upper()}", data=report_value,
+                                   file_name=f"shopimpact_report.{ext}", mime=mime)
 
 # ----------------------
 # PAGE: Settings & About
 # ----------------------
 elif page == "Settings & About":
-    st.markdown(page_css("Settings & About"), unsafe_allow_html=True)
-    st.markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>Settings & About — {NEON_THEMES['Settings & About']['name']}</div>"
+    markdown(f"<div class='card' style='margin-bottom:14px'><div style='font-size:24px;font-weight:800'>Settings & About — {NEON_THEMES['Settings & About']['name']}</div>"
                 f"<div style='font-size:13px;color:rgba(255,255,255,0.85)'>Edit multipliers and learn how the app works</div></div>", unsafe_allow_html=True)
-    st.markdown("""
+    markdown("""
     **What is ShopImpact?**  
     A colourful, immersive app that estimates environmental impact of purchases and encourages greener choices.
 
@@ -498,27 +606,62 @@ elif page == "Settings & About":
     3. Deploy to Streamlit Cloud and include the live link in your submission.
     """, unsafe_allow_html=True)
 
-    st.markdown("### Edit multipliers (session-only)")
+    profile = current_profile()
+    markdown(f"### Edit multipliers (profile: {st.session_state.ledger_user})")
+    st.caption(f"Active table: {profile.name} · {profile.version}. "
+               + ("Changes only apply to this browser session; choose a Profile name in the sidebar to keep them. "
+                  if st.session_state.ledger_user == ANONYMOUS else "Changes only apply to this profile; ")
+               + "purchases keep the multiplier version they were logged with.")
     with st.form("mult_form"):
         edited = {}
         cols = st.columns(2)
         i = 0
-        for k,v in MULTIPLIERS.items():
+        for k,v in profile.table.items():
             with cols[i % 2]:
-                newv = st.number_input(f"{k}", min_value=0.0, value=float(v), step=0.01, key=f"m_{k}")
+                # keyed by version so the inputs reload when the active table changes
+                newv = st.number_input(f"{k}", min_value=0.0, value=float(v), step=0.01, key=f"m_{profile.version}_{k}")
                 edited[k] = newv
             i += 1
-        if st.form_submit_button("Save multipliers"):
-            MULTIPLIERS.update(edited)
-            st.success("Saved multipliers for this session (reload resets).")
+        save_multipliers = st.form_submit_button("Save multipliers")
+    if save_multipliers:
+        try:
+            saved = use_profile(profile.with_overrides(edited, name="Custom"))
+        except StoreError as e:
+            st.error(f"Couldn't save multipliers: {e}")
+        else:
+            st.success(f"Saved multipliers as {saved.version} for "
+                       + ("this session." if st.session_state.ledger_user == ANONYMOUS else f"profile '{st.session_state.ledger_user}'."))
+    elif profile.version != DEFAULT_PROFILE.version and st.button("Reset to default multipliers"):
+        try:
+            use_profile(DEFAULT_PROFILE)
+        except StoreError as e:
+            st.error(f"Couldn't reset multipliers: {e}")
+        else:
+            st.success("Default multipliers restored.")
+
+    if prof.enabled:
+        # only reachable with profiling switched on (SHOPIMPACT_PROFILE=1 or ?diag=1)
+        with st.expander("Diagnostics — rerun profile"):
+            stats = prof.stats()
+            st.caption(f"Last {stats['reruns']} reruns of this session (the current one is recorded when it finishes). "
+                       "Spans in seconds; bytes are what each rerun handed to Streamlit.")
+            st.dataframe([{"kind": kind, "name": name, **s} for kind in ("spans", "bytes") for name, s in stats[kind].items()],
+                         use_container_width=True)
+            d1, d2 = st.columns(2)
+            d1.download_button("Download JSON", data=prof.to_json(), file_name="shopimpact_profile.json", mime="application/json")
+            d2.download_button("Download Prometheus metrics", data=prof.to_prometheus(),
+                               file_name="shopimpact_profile.prom", mime="text/plain")
+
+prof.stop(page_timer)
 
 # close wrappers
-st.markdown("</div>", unsafe_allow_html=True)  # page-content
-st.markdown("</div>", unsafe_allow_html=True)  # page-wrap
-
-# If a pulse id exists (recent), add a small invisible element to keep it stable (no action)
-if st.session_state.get("last_pulse_id"):
-    pass
+markdown("</div>", unsafe_allow_html=True)  # page-content
+markdown("</div>", unsafe_allow_html=True)  # page-wrap
 
 # footer
-st.markdown("<div style='text-align:center;color:rgba(255,255,255,0.85);padding:18px 0'>Made with neon love 💖 — ask me if you want auto screenshots or PDF report next.</div>", unsafe_allow_html=True)
+markdown("<div style='text-align:center;color:rgba(255,255,255,0.85);padding:18px 0'>Made with neon love 💖 — ask me if you want auto screenshots next.</div>", unsafe_allow_html=True)
+
+# persist this rerun's purchases in one batch
+with prof.span("flush"):
+    flush_purchases()
+prof.end_rerun()
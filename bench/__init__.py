@@ -0,0 +1,2 @@
+# bench
+# ShopImpact - reproducible benchmarks over synthetic ledgers (python -m bench --help)
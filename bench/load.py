@@ -0,0 +1,92 @@
+# bench/load.py
+# ShopImpact - concurrent-session load test for the SQLite store (sessions simulated as threads)
+#   python -m bench.load --writers 64 --seconds 5
+#   python -m bench.load --writers 64 --max-batch 1   -> same load without group commits
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from bench.synthetic import generate_entries
+from storage import SQLiteStore, entry_to_row
+
+
+def session(store, user_id, entries, stop, latencies, read_every, seed):
+    # one simulated browser session: submits the purchase form, now and then reloads its history
+    rng = random.Random(seed)
+    submitted = 0
+    while not stop.is_set():
+        row = entry_to_row(entries[rng.randrange(len(entries))])
+        started = time.perf_counter()
+        store.write_rows(user_id, [row])
+        latencies.append(time.perf_counter() - started)
+        submitted += 1
+        if read_every and submitted % read_every == 0:
+            store.query_rows(user_id)
+
+
+def run_load(writers=64, seconds=5.0, readers=8, max_batch=1000, read_every=20, seed=0, path=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(path or os.path.join(tmp, "load.db"), readers=readers)
+        store._writer.max_batch = max_batch
+        entries = list(generate_entries(2_000, seed=seed))
+        stop = threading.Event()
+        # one latency list per session thread, merged at the end
+        per_session = [[] for _ in range(writers)]
+        threads = [threading.Thread(target=session, args=(store, f"load-{i}", entries, stop, per_session[i], read_every, seed + i))
+                   for i in range(writers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        commits, batches = store._writer.commits, store._writer.batches
+        store.close()
+    latencies = np.concatenate([np.asarray(lat) for lat in per_session if lat]) if any(per_session) else np.zeros(1)
+    return {
+        "writers": writers,
+        "readers": readers,
+        "max_batch": max_batch,
+        "seconds": elapsed,
+        "submits": int(latencies.size),
+        "throughput_per_s": latencies.size / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "max_ms": float(latencies.max() * 1000),
+        "commits": commits,
+        "submits_per_commit": batches / commits if commits else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description="ShopImpact concurrent write load test")
+    parser.add_argument("--writers", type=int, default=64, help="simulated concurrent sessions")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8, help="read-only connection pool size")
+    parser.add_argument("--max-batch", type=int, default=1000, help="submits per group commit (1 disables grouping)")
+    parser.add_argument("--read-every", type=int, default=20, help="each session reloads its history every N submits (0: never)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="database file to load (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    result = run_load(args.writers, args.seconds, args.readers, args.max_batch, args.read_every, args.seed, args.db)
+    print(f"{result['writers']} writers, {result['seconds']:.1f}s: {result['throughput_per_s']:,.0f} submits/s, "
+          f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+          f"{result['submits_per_commit']:.1f} submits per commit", file=sys.stderr)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
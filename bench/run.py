@@ -0,0 +1,171 @@
+# bench/run.py
+# ShopImpact - time the hot paths at growing ledger sizes, write JSON, compare against a baseline
+#   python -m bench --sizes 1k,10k,100k,1m --out bench.json
+#   python -m bench --baseline bench.json --threshold 1.25 --min-delta 1   -> exit 1 on regressions
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import simulator
+import theme
+from aggregates import summary_by_month
+from bench.synthetic import build_ledger
+from charts import ChartCache, monthly_charts
+from effects import fullscreen_effect_html
+from export import export_bytes
+from ledger import HistoryFilter
+from multipliers import DEFAULT_PROFILE
+
+DEFAULT_SIZES = "1k,10k,100k,1m"
+# differences below this many seconds are timer / scheduler noise, whatever the ratio
+MIN_DELTA = 0.001
+# fast cases keep repeating until they've run this long in total (at most MAX_REPEAT times), so their
+# best time is taken over enough runs to be stable
+MIN_TOTAL_S = 0.5
+MAX_REPEAT = 50
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        scale = {"k": 1_000, "m": 1_000_000}.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def _busiest(ledger):
+    # month / category filter that hits real rows: the latest month and its top category
+    month = ledger.monthly.latest()[0]
+    category = max(ledger.monthly.by_category[month].items(), key=lambda kv: kv[1][0])[0]
+    return HistoryFilter(month=month, category=category)
+
+
+def cases(ledger):
+    # name -> (setup, run); setup drops whatever cache would otherwise hide the work
+    flt = _busiest(ledger)
+    all_rows = ledger.select(HistoryFilter())
+
+    def drop_frame():
+        ledger._frame = None
+
+    def drop_selections():
+        ledger._selections.clear()
+
+    return {
+        "purchases_df": (drop_frame, ledger.frame),
+        "summary_by_month": (None, lambda: summary_by_month(ledger.frame())),
+        "monthly_aggregates": (None, ledger.monthly.to_frame),
+        "history_filter": (drop_selections, lambda: ledger.select(flt)),
+        "history_filter_all": (drop_selections, lambda: ledger.select(
+            HistoryFilter(start="2022-01-01", end="2022-12-31", min_price=5.0, eco=False))),
+        "history_page": (drop_selections, lambda: ledger.page(HistoryFilter(), "price", False, 0, 50)),
+        "csv_export": (None, lambda: export_bytes(ledger, all_rows, "csv")),
+        "chart_render": (None, lambda: monthly_charts(ChartCache(), ledger.monthly.to_frame(), "Dashboard")),
+        "page_css": (theme._CSS_CACHE.clear, lambda: theme.page_css("Dashboard")),
+        "fullscreen_effect": (None, lambda: fullscreen_effect_html("Add Purchase", intensity=18)),
+        "what_if": (simulator._MEMO.clear, lambda: simulator.simulate(ledger, DEFAULT_PROFILE)),
+    }
+
+
+def time_case(setup, run, repeat, min_total=MIN_TOTAL_S, max_repeat=MAX_REPEAT):
+    times = []
+    while len(times) < repeat or (sum(times) < min_total and len(times) < max_repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def run_suite(sizes, repeat=5, seed=0, only=None, log=print):
+    results = []
+    for n in sizes:
+        started = time.perf_counter()
+        ledger = build_ledger(n, seed=seed)
+        log(f"{n:>9,} rows  (generated in {time.perf_counter() - started:.2f}s)")
+        # fewer repeats for the very large ledgers, never fewer than one
+        reps = max(1, repeat if n < 1_000_000 else min(repeat, 3))
+        for name, (setup, run) in cases(ledger).items():
+            if only and name not in only:
+                continue
+            times = time_case(setup, run, reps)
+            results.append({"case": name, "rows": n, "runs": len(times),
+                            "min_s": min(times), "median_s": statistics.median(times)})
+            log(f"    {name:<20} median {statistics.median(times) * 1000:9.2f} ms   min {min(times) * 1000:9.2f} ms")
+    return results
+
+
+def metadata(seed):
+    import matplotlib
+    import pandas
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "seed": seed,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(results, baseline, threshold, min_delta=MIN_DELTA):
+    # [(case, rows, baseline_s, current_s, ratio)] for every case slower than threshold x baseline.
+    # compares best-of-N times (the median moves with machine load) and ignores slowdowns under min_delta
+    before = {(r["case"], r["rows"]): r["min_s"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = before.get((r["case"], r["rows"]))
+        if old is None or old <= 0:
+            continue
+        ratio = r["min_s"] / old
+        if ratio > threshold and r["min_s"] - old >= min_delta:
+            regressions.append((r["case"], r["rows"], old, r["min_s"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="ShopImpact benchmark suite")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated ledger sizes, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (min and median are reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", default="", help="comma-separated subset of cases to run")
+    parser.add_argument("--out", help="write results as JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail when a case's best time exceeds its baseline best time x threshold")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA * 1000,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args(argv)
+
+    only = {c.strip() for c in args.cases.split(",") if c.strip()}
+    log = (lambda msg: print(msg, file=sys.stderr)) if not args.out else print
+    results = run_suite(parse_sizes(args.sizes), args.repeat, args.seed, only, log)
+    report = {"meta": metadata(args.seed), "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta / 1000)
+        for case, rows, old, new, ratio in regressions:
+            print(f"REGRESSION {case} @ {rows:,} rows: {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.2f}x, "
+              f"min delta {args.min_delta:g} ms)", file=sys.stderr)
+    return 0
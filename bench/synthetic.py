@@ -0,0 +1,119 @@
+# bench/synthetic.py
+# ShopImpact - seeded generator of realistic purchase ledgers
+
+import numpy as np
+
+from ledger import COLUMNS, PurchaseLedger
+from multipliers import DEFAULT_PROFILE, MULTIPLIERS
+
+# relative purchase frequency, typical price (median) and spread per category
+CATEGORY_MIX = {
+    "Clothing (Fast Fashion)": (10, 25.0, 0.6),
+    "Clothing (Sustainable/Second-Hand)": (4, 30.0, 0.6),
+    "Footwear (Leather)": (2, 110.0, 0.5),
+    "Footwear (Synthetic)": (3, 60.0, 0.5),
+    "Electronics": (3, 180.0, 1.0),
+    "Groceries (Packaged)": (30, 12.0, 0.7),
+    "Groceries (Fresh/Local)": (20, 9.0, 0.6),
+    "Personal Care": (8, 8.0, 0.6),
+    "Furniture": (1, 250.0, 0.9),
+    "Beverages (Single-Use Bottle)": (10, 2.5, 0.4),
+    "Books & Stationery": (4, 15.0, 0.5),
+    "Home Appliances": (1, 220.0, 0.8),
+    "Other": (4, 20.0, 1.0),
+}
+# (brand, eco/ethical) per category
+BRANDS = {
+    "Clothing (Fast Fashion)": [("Zara", False), ("H&M", False), ("Shein", False), ("Primark", False), ("Uniqlo", False)],
+    "Clothing (Sustainable/Second-Hand)": [("Patagonia", True), ("Vinted", True), ("Thought", True), ("Oxfam", True)],
+    "Footwear (Leather)": [("Clarks", False), ("Dr. Martens", False), ("Veja", True)],
+    "Footwear (Synthetic)": [("Nike", False), ("Adidas", False), ("Allbirds", True), ("Skechers", False)],
+    "Electronics": [("Apple", False), ("Samsung", False), ("Fairphone", True), ("Back Market", True), ("Sony", False)],
+    "Groceries (Packaged)": [("Tesco", False), ("Walmart", False), ("Nestle", False), ("Aldi", False)],
+    "Groceries (Fresh/Local)": [("Farmers Market", True), ("Riverford", True), ("Whole Foods", False)],
+    "Personal Care": [("Lush", True), ("Dove", False), ("Ethique", True), ("Nivea", False)],
+    "Furniture": [("IKEA", False), ("Habitat", False), ("Vinterior", True)],
+    "Beverages (Single-Use Bottle)": [("Coca-Cola", False), ("Evian", False), ("Red Bull", False)],
+    "Books & Stationery": [("Waterstones", False), ("World of Books", True), ("Amazon", False)],
+    "Home Appliances": [("Bosch", False), ("Miele", False), ("Dyson", False)],
+    "Other": [("Amazon", False), ("eBay", False), ("Etsy", True)],
+}
+PRODUCTS = {
+    "Clothing (Fast Fashion)": ["T-Shirt", "Jeans", "Dress", "Hoodie", "Jacket"],
+    "Clothing (Sustainable/Second-Hand)": ["Organic Tee", "Vintage Jacket", "Wool Sweater", "Preloved Jeans"],
+    "Footwear (Leather)": ["Boots", "Loafers", "Leather Sneakers"],
+    "Footwear (Synthetic)": ["Running Shoes", "Trainers", "Sandals"],
+    "Electronics": ["Phone", "Laptop", "Headphones", "Charger", "Tablet"],
+    "Groceries (Packaged)": ["Cereal", "Crisps", "Pasta", "Frozen Pizza", "Biscuits"],
+    "Groceries (Fresh/Local)": ["Apples", "Vegetable Box", "Bread", "Eggs", "Milk"],
+    "Personal Care": ["Shampoo Bar", "Toothpaste", "Deodorant", "Soap"],
+    "Furniture": ["Chair", "Desk", "Bookshelf", "Sofa"],
+    "Beverages (Single-Use Bottle)": ["Cola", "Water Bottle", "Energy Drink"],
+    "Books & Stationery": ["Novel", "Notebook", "Pens", "Textbook"],
+    "Home Appliances": ["Kettle", "Vacuum", "Washing Machine", "Toaster"],
+    "Other": ["Gift", "Toy", "Garden Tools", "Candle"],
+}
+
+
+def generate_columns(n, seed=0, start="2021-01-01", years=3, profile=DEFAULT_PROFILE):
+    # dict of ledger columns for n purchases; identical output for identical arguments
+    rng = np.random.default_rng(seed)
+    cats = list(MULTIPLIERS)
+    weights = np.array([CATEGORY_MIX[c][0] for c in cats], dtype=np.float64)
+    cat_idx = rng.choice(len(cats), size=n, p=weights / weights.sum())
+
+    medians = np.array([CATEGORY_MIX[c][1] for c in cats])
+    spreads = np.array([CATEGORY_MIX[c][2] for c in cats])
+    price = np.round(medians[cat_idx] * np.exp(rng.normal(0.0, spreads[cat_idx])), 2)
+
+    # uniform over the date range, in date order like a real ledger
+    days = int(365.25 * years)
+    date = np.datetime64(start, "D") + np.sort(rng.integers(0, days, size=n))
+
+    brand = np.empty(n, dtype=object)
+    eco = np.empty(n, dtype=bool)
+    name = np.empty(n, dtype=object)
+    for i, c in enumerate(cats):
+        rows = np.flatnonzero(cat_idx == i)
+        if not len(rows):
+            continue
+        options = BRANDS[c]
+        pick = rng.integers(0, len(options), size=len(rows))
+        brand[rows] = np.array([b for b, _ in options], dtype=object)[pick]
+        eco[rows] = np.array([e for _, e in options])[pick]
+        names = PRODUCTS[c]
+        name[rows] = np.array(names, dtype=object)[rng.integers(0, len(names), size=len(rows))]
+
+    category = np.array(cats, dtype=object)[cat_idx]
+    impact = np.round(price * profile.vector(cats)[cat_idx], 2)
+    return {
+        "date": date,
+        "product_type": category,
+        "product_name": name,
+        "brand": brand,
+        "price": price,
+        "impact": impact,
+        "eco_brand": eco,
+        "multiplier_version": profile.version,
+    }
+
+
+def build_ledger(n, seed=0, **kwargs):
+    columns = generate_columns(n, seed, **kwargs)
+    ledger = PurchaseLedger(capacity=max(n, 1))
+    ledger.append_columns(*(columns[c] for c in COLUMNS))
+    return ledger
+
+
+def generate_entries(n, seed=0, **kwargs):
+    # the same purchases as add_purchase-style dicts
+    columns = generate_columns(n, seed, **kwargs)
+    dates = np.datetime_as_string(columns["date"], unit="D")
+    for i in range(n):
+        entry = {c: columns[c][i] for c in COLUMNS if c not in ("date", "multiplier_version")}
+        entry["date"] = str(dates[i])
+        entry["price"] = float(entry["price"])
+        entry["impact"] = float(entry["impact"])
+        entry["eco_brand"] = bool(entry["eco_brand"])
+        entry["multiplier_version"] = columns["multiplier_version"]
+        yield entry
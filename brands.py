@@ -0,0 +1,134 @@
+# brands.py
+# ShopImpact - brand registry: canonical names, aliases, eco/ethical flags and prefix autocomplete
+
+import bisect
+import csv
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "brands.csv")
+# trailing words that don't change which brand is meant ("Nike Store", "Tesco PLC", "Made.com")
+_SUFFIXES = {"ltd", "limited", "inc", "plc", "llc", "gmbh", "co", "com", "uk", "store", "stores", "online"}
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text, strip_suffixes=True):
+    # comparison key: accents dropped, case folded, "&" spelled out, punctuation and legal/store suffixes removed
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().casefold().replace("&", " and ")
+    words = _WORD.findall(text)
+    while strip_suffixes and len(words) > 1 and words[-1] in _SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def read_brand_file(path=DATA_PATH):
+    # [(name, eco, category or None, [alias, ...])] from the shipped CSV
+    with open(path, encoding="utf-8", newline="") as f:
+        return [(r["name"].strip(), r["eco"].strip() == "1", r["category"].strip() or None,
+                 [a.strip() for a in r["aliases"].split("|") if a.strip()])
+                for r in csv.DictReader(f)]
+
+
+class BrandRegistry:
+    # brand id = position in `names`; every spelling (name, aliases, spaceless form) maps to one id
+    def __init__(self):
+        self.names = []
+        self.eco = []
+        self.categories = []
+        self._ids = {}       # normalised key -> id
+        self._keys = []      # sorted normalised keys, for prefix search
+        self._key_ids = []   # brand id per entry of _keys
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, rows):
+        registry = cls()
+        for name, eco, category, aliases in rows:
+            registry._add(name, eco, category, aliases)
+        pairs = sorted(registry._ids.items())
+        registry._keys = [k for k, _ in pairs]
+        registry._key_ids = [i for _, i in pairs]
+        return registry
+
+    def _add(self, name, eco, category, aliases, index=False):
+        key = normalize(name)
+        if key in self._ids:
+            return self._ids[key]
+        brand_id = len(self.names)
+        self.names.append(name)
+        self.eco.append(bool(eco))
+        self.categories.append(category)
+        for spelling in {key, key.replace(" ", ""), *(normalize(a) for a in aliases)}:
+            if spelling and spelling not in self._ids:
+                self._ids[spelling] = brand_id
+                if index:
+                    pos = bisect.bisect_left(self._keys, spelling)
+                    self._keys.insert(pos, spelling)
+                    self._key_ids.insert(pos, brand_id)
+        return brand_id
+
+    def add(self, name, eco=False, category=None, aliases=()):
+        # register a brand at runtime; returns its id (the existing one when the name is already known)
+        with self._lock:
+            return self._add(name, eco, category, aliases, index=True)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, text):
+        key = normalize(text) if text else ""
+        brand_id = self._ids.get(key)
+        if brand_id is None and key:
+            brand_id = self._ids.get(key.replace(" ", ""))
+        return brand_id
+
+    def canonical(self, text):
+        # canonical spelling of a known brand, else None
+        brand_id = self.lookup(text)
+        return None if brand_id is None else self.names[brand_id]
+
+    def canonicalize(self, text):
+        # canonical spelling when known, otherwise the input with its whitespace tidied
+        canonical = self.canonical(text)
+        return canonical if canonical is not None else " ".join(text.split())
+
+    def is_eco(self, text):
+        brand_id = self.lookup(text)
+        return brand_id is not None and self.eco[brand_id]
+
+    def complete(self, prefix, limit=8):
+        # canonical names whose name or alias starts with `prefix` (sorted-key scan from a bisect)
+        key = normalize(prefix, strip_suffixes=False)
+        if not key:
+            return []
+        keys, ids = self._keys, self._key_ids
+        out, seen = [], set()
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and keys[i].startswith(key) and len(out) < limit:
+            if ids[i] not in seen:
+                seen.add(ids[i])
+                out.append(self.names[ids[i]])
+            i += 1
+        return out
+
+    def canonicalize_many(self, values):
+        # (canonical names, eco flags) for an iterable of raw brand strings; each distinct value is resolved once
+        memo = {}
+        names, eco = [], []
+        for value in values:
+            hit = memo.get(value)
+            if hit is None:
+                brand_id = self.lookup(value)
+                hit = memo[value] = ((" ".join(value.split()), False) if brand_id is None
+                                     else (self.names[brand_id], self.eco[brand_id]))
+            names.append(hit[0])
+            eco.append(hit[1])
+        return np.array(names, dtype=object), np.array(eco, dtype=bool)
+
+
+def load_registry(path=DATA_PATH):
+    return BrandRegistry.from_rows(read_brand_file(path))
@@ -0,0 +1,130 @@
+# categorizer.py
+# ShopImpact - offline product categorisation from product name + brand (keyword index, no downloads)
+
+import json
+import os
+import re
+
+import numpy as np
+
+import brands as brand_data
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "categories.json")
+# memoised (name, brand) results kept per index before the memo is reset
+MEMO_SIZE = 100_000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokens(text):
+    # lowercase alphanumeric runs; singular/plural forms are listed separately in the data file
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class CategoryIndex:
+    # compiled keyword table: token n-gram -> ((category code, weight), ...)
+    def __init__(self, categories, terms, brands, modifiers):
+        self.categories = categories
+        # single tokens are looked up as plain strings; phrases only where their first token occurs
+        self.words = {k[0]: v for k, v in terms.items() if len(k) == 1}
+        self.phrases = {k: v for k, v in terms.items() if len(k) > 1}
+        self.starters = {k[0] for k in self.phrases}
+        self.max_gram = max((len(k) for k in terms), default=1)
+        self.brands = brands          # normalised brand name -> (category code, weight)
+        self.modifiers = modifiers    # [(from code, to code, {word, ...}, {phrase, ...}, {phrase start, ...})]
+        self._memo = {}
+        self._brand_memo = {}
+
+    @classmethod
+    def compile(cls, doc):
+        weights = doc["weights"]
+        categories = sorted(set(doc["keywords"]) | set(doc["brands"])
+                            | {m[k] for m in doc.get("modifiers", []) for k in ("from", "to")})
+        code = {c: i for i, c in enumerate(categories)}
+        terms, brands = {}, {}
+
+        def add(text, category, weight):
+            key = tuple(tokens(text))
+            if key:
+                terms.setdefault(key, []).append((code[category], weight))
+
+        for category, keywords in doc["keywords"].items():
+            for kw in keywords:
+                add(kw, category, weights["phrase"] if len(tokens(kw)) > 1 else weights["word"])
+        for category, names in doc["brands"].items():
+            for brand in names:
+                brands[" ".join(tokens(brand))] = (code[category], weights["brand"])
+                # bank memos often carry the merchant inside the description ("NIKE STORE 0423")
+                add(brand, category, weights["brand"])
+        modifiers = []
+        for m in doc.get("modifiers", []):
+            grams = [tuple(tokens(kw)) for kw in m["keywords"]]
+            phrases = {g for g in grams if len(g) > 1}
+            modifiers.append((code[m["from"]], code[m["to"]], {g[0] for g in grams if len(g) == 1},
+                              phrases, {g[0] for g in phrases}))
+        return cls(categories, {k: tuple(v) for k, v in terms.items()}, brands, modifiers)
+
+    def _phrases(self, toks, starters):
+        # multi-token n-grams of `toks`, only at positions where a known phrase can start
+        for i, tok in enumerate(toks):
+            if tok in starters:
+                for n in range(2, min(self.max_gram, len(toks) - i) + 1):
+                    yield tuple(toks[i:i + n])
+
+    def _brand(self, brand):
+        hit = self._brand_memo.get(brand, False)
+        if hit is False:
+            hit = self._brand_memo[brand] = self.brands.get(" ".join(tokens(brand)))
+        return hit
+
+    def _classify(self, name, brand):
+        scores = {}
+        toks = tokens(name)
+        for tok in dict.fromkeys(toks):
+            for c, w in self.words.get(tok, ()):
+                scores[c] = scores.get(c, 0.0) + w
+        for gram in set(self._phrases(toks, self.starters)):
+            for c, w in self.phrases.get(gram, ()):
+                scores[c] = scores.get(c, 0.0) + w
+        hit = self._brand(brand) if brand else None
+        if hit is not None:
+            scores[hit[0]] = scores.get(hit[0], 0.0) + hit[1]
+        if not scores:
+            return None, 0.0
+        best = max(scores, key=scores.get)
+        confidence = scores[best] / sum(scores.values())
+        for source, target, words, phrases, starters in self.modifiers:
+            # e.g. "vintage" / "preloved" turns a clothing match into second-hand clothing
+            if best == source and (not words.isdisjoint(toks) or not phrases.isdisjoint(self._phrases(toks, starters))):
+                best = target
+        return self.categories[best], confidence
+
+    def categorize(self, name, brand=""):
+        # (category or None, confidence 0..1); memoised per (name, brand)
+        key = (name, brand)
+        hit = self._memo.get(key)
+        if hit is None:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            hit = self._memo[key] = self._classify(name, brand)
+        return hit
+
+    def categorize_many(self, names, brands=None, default=None):
+        # batch API: (categories as an object array, confidences); unmatched rows get `default`
+        names = list(names)
+        brands = [""] * len(names) if brands is None else list(brands)
+        results = [self.categorize(n, b) for n, b in zip(names, brands)]
+        categories = np.array([c if c is not None else default for c, _ in results], dtype=object)
+        confidence = np.fromiter((s for _, s in results), dtype=np.float64, count=len(results))
+        return categories, confidence
+
+
+def load_index(path=DATA_PATH, brands_path=brand_data.DATA_PATH):
+    # keyword table from categories.json, brand hints from the brand registry's data file
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    doc["brands"] = {}
+    for name, _, category, _ in brand_data.read_brand_file(brands_path):
+        if category is not None:
+            doc["brands"].setdefault(category, []).append(name)
+    return CategoryIndex.compile(doc)
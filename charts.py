@@ -0,0 +1,99 @@
+# charts.py
+# ShopImpact - rendered chart cache (PNG bytes keyed on data + theme) and figure lifecycle
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ChartCache:
+    # process-wide LRU of rendered images; safe to share between Streamlit sessions
+    def __init__(self, max_items=64):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        # render outside the lock; two sessions racing on the same key just render twice
+        data = render()
+        with self._lock:
+            self.misses += 1
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return data
+
+    def __len__(self):
+        return len(self._items)
+
+
+def chart_key(kind, theme_name, *parts):
+    # stable digest over the chart kind, theme and the data it plots (strings or numpy arrays)
+    h = hashlib.blake2b(digest_size=16)
+    for part in (kind, theme_name, *parts):
+        if isinstance(part, str):
+            h.update(part.encode())
+        elif part.dtype == object:
+            h.update("\x1f".join(map(str, part)).encode())
+        else:
+            h.update(np.ascontiguousarray(part).tobytes())
+        h.update(b"|")
+    return kind + ":" + h.hexdigest()
+
+
+def _to_png(fig):
+    # savefig then drop every reference so the figure is freed immediately
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format="png", bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buf.getvalue()
+
+
+def _new_figure(figsize):
+    # object-oriented API: no pyplot state machine, nothing left registered after rendering
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def render_bar(labels, values, title, color):
+    fig, ax = _new_figure((8,3))
+    ax.bar(list(labels), list(values), color=color)
+    ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    return _to_png(fig)
+
+
+def render_line(labels, values, title, color):
+    fig, ax = _new_figure((8,3))
+    ax.plot(list(labels), list(values), marker='o', color=color)
+    ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    return _to_png(fig)
+
+
+def monthly_charts(cache, summary, theme_name, spend_color="#39ff14", impact_color="#0ff0fc"):
+    # (spend_png, impact_png) for a monthly summary frame, served from cache when the data is unchanged
+    months = summary['month'].astype(str).to_numpy()
+    spend = summary['total_spend'].to_numpy(dtype=np.float64)
+    impact = summary['total_impact'].to_numpy(dtype=np.float64)
+    spend_png = cache.get_or_render(chart_key("spend", theme_name, months, spend, spend_color),
+                                    lambda: render_bar(months, spend, "Monthly Spend", spend_color))
+    impact_png = cache.get_or_render(chart_key("impact", theme_name, months, impact, impact_color),
+                                     lambda: render_line(months, impact, "Monthly CO₂ Impact", impact_color))
+    return spend_png, impact_png
+
@@ -0,0 +1,150 @@
+# cohorts.py
+# ShopImpact - cross-user rollups (month x category x brand, user x month) kept in the SQLite store,
+# refreshed incrementally from a purchases.id watermark. Cohort queries only ever read these tables.
+
+import os
+import threading
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup_month_category_brand (
+    month TEXT NOT NULL,
+    product_type TEXT NOT NULL,
+    brand_id INTEGER NOT NULL,
+    purchases INTEGER NOT NULL,
+    spend REAL NOT NULL,
+    impact REAL NOT NULL,
+    PRIMARY KEY (month, product_type, brand_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_user_month (
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    purchases INTEGER NOT NULL,
+    spend REAL NOT NULL,
+    impact REAL NOT NULL,
+    PRIMARY KEY (user_id, month)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_rollup_user_month_impact ON rollup_user_month(month, impact);
+"""
+
+# purchases.id ranges folded per refresh step, so a large backfill never holds the writer for long
+REFRESH_BATCH = 100_000
+DEFAULT_INTERVAL = 30.0
+
+_FOLD_MONTH_CATEGORY_BRAND = """
+INSERT INTO rollup_month_category_brand (month, product_type, brand_id, purchases, spend, impact)
+SELECT substr(date, 1, 7), product_type, brand_id, COUNT(*), SUM(price), SUM(impact)
+FROM purchases WHERE id > ? AND id <= ?
+GROUP BY 1, 2, 3
+ON CONFLICT (month, product_type, brand_id) DO UPDATE SET
+    purchases = purchases + excluded.purchases,
+    spend = spend + excluded.spend,
+    impact = impact + excluded.impact
+"""
+_FOLD_USER_MONTH = """
+INSERT INTO rollup_user_month (user_id, month, purchases, spend, impact)
+SELECT user_id, substr(date, 1, 7), COUNT(*), SUM(price), SUM(impact)
+FROM purchases WHERE id > ? AND id <= ?
+GROUP BY 1, 2
+ON CONFLICT (user_id, month) DO UPDATE SET
+    purchases = purchases + excluded.purchases,
+    spend = spend + excluded.spend,
+    impact = impact + excluded.impact
+"""
+
+
+def refresh_rollups(conn, batch=REFRESH_BATCH):
+    # fold purchases past the watermark (at most `batch` ids) into the rollups; returns True once the
+    # rollups have caught up with the purchases table. the write lock is taken before the watermark is
+    # read, so two processes sharing the file can't both fold the same id range
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT last_id FROM rollup_watermark WHERE name = 'purchases'").fetchone()
+    low = row[0] if row else 0
+    newest = conn.execute("SELECT MAX(id) FROM purchases").fetchone()[0] or 0
+    high = min(newest, low + batch)
+    if high > low:
+        conn.execute(_FOLD_MONTH_CATEGORY_BRAND, (low, high))
+        conn.execute(_FOLD_USER_MONTH, (low, high))
+        conn.execute("INSERT INTO rollup_watermark (name, last_id) VALUES ('purchases', ?) "
+                     "ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id", (high,))
+    return high >= newest
+
+
+class RollupRefresher:
+    # background job: every `interval` seconds, fold new purchases into the rollups via the store's writer
+    def __init__(self, store, interval=None):
+        self.store = store
+        self.interval = float(os.environ.get("SHOPIMPACT_ROLLUP_INTERVAL", DEFAULT_INTERVAL)) if interval is None else interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shopimpact-rollups", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.store.refresh_rollups()
+            except Exception:  # keep refreshing after a transient failure (locked file, disk full)
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# ----------------------
+# Cohort queries (rollup tables only)
+# ----------------------
+RANKINGS = {
+    "impact": "SUM(r.impact)",
+    "spend": "SUM(r.spend)",
+    "purchases": "SUM(r.purchases)",
+    # CO₂ per unit spent
+    "intensity": "SUM(r.impact) / NULLIF(SUM(r.spend), 0)",
+}
+
+
+def rollup_months(conn):
+    return [r[0] for r in conn.execute("SELECT DISTINCT month FROM rollup_user_month ORDER BY month")]
+
+
+def user_percentile(conn, user_id, month):
+    # (share of shoppers with a higher impact that month, shoppers that month), or None without purchases
+    row = conn.execute("SELECT impact FROM rollup_user_month WHERE user_id = ? AND month = ?", (user_id, month)).fetchone()
+    if row is None:
+        return None
+    higher, shoppers = conn.execute("SELECT SUM(impact > ?), COUNT(*) FROM rollup_user_month WHERE month = ?",
+                                    (row[0], month)).fetchone()
+    return higher / shoppers, shoppers
+
+
+def category_leaderboard(conn, month=None):
+    # [(category, purchases, spend, impact)], highest impact first
+    sql = "SELECT r.product_type, SUM(r.purchases), SUM(r.spend), SUM(r.impact) FROM rollup_month_category_brand r"
+    params = []
+    if month is not None:
+        sql += " WHERE r.month = ?"
+        params.append(month)
+    return conn.execute(sql + " GROUP BY r.product_type ORDER BY 4 DESC", params).fetchall()
+
+
+def brand_ranking(conn, month=None, order="impact", limit=10):
+    # [(brand, purchases, spend, impact, impact per spend)] ordered by one of RANKINGS
+    if order not in RANKINGS:
+        raise ValueError(f"Unknown ranking {order!r} (choose from {', '.join(RANKINGS)})")
+    sql = ("SELECT b.name, SUM(r.purchases), SUM(r.spend), SUM(r.impact), SUM(r.impact) / NULLIF(SUM(r.spend), 0) "
+           "FROM rollup_month_category_brand r JOIN brands b ON b.id = r.brand_id")
+    params = []
+    if month is not None:
+        sql += " WHERE r.month = ?"
+        params.append(month)
+    sql += f" GROUP BY r.brand_id ORDER BY {RANKINGS[order]} DESC LIMIT ?"
+    return conn.execute(sql, params + [limit]).fetchall()
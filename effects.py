@@ -0,0 +1,48 @@
+# effects.py
+# ShopImpact - full-screen floats and pulse HTML shown when a purchase is added
+# Each (theme, intensity) gets a small pool of pre-rendered variants, built once per process; per-icon
+# position, timing, size and colour come from nth-child rules in the theme CSS, so a variant is just icons.
+
+import random
+import threading
+
+ICONS = ["🌱","💚","🌿","🌎","✨","💫","🪴","⚡","🌸"]
+POOL_SIZE = 8
+
+# (theme name, intensity) -> [html, ...]
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _render_variant(rng, index, intensity):
+    # --o nudges the whole layer sideways so variants don't land icons in the same spots
+    icons = "".join(f"<i>{rng.choice(ICONS)}</i>" for _ in range(intensity))
+    return (f"<div class='float-layer' data-v='{index}' style='--o:{rng.randint(0, 6)}%'>{icons}</div>"
+            "<div class='neon-pulse-full active'></div>")
+
+
+def effect_pool(theme_name, intensity=14, size=POOL_SIZE):
+    key = (theme_name, intensity)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                # seeded per theme so every worker process serves the same variants
+                rng = random.Random(f"{theme_name}:{intensity}")
+                pool = _POOLS[key] = [_render_variant(rng, i, intensity) for i in range(size)]
+    return pool
+
+
+def fullscreen_effect_html(theme_name, intensity=14, previous=None, reduced=False):
+    # returns (variant, html) for one burst of floating icons plus the pulse overlay.
+    # never repeats `previous` (identical markup would not restart the animation); reduced -> (None, "")
+    if reduced:
+        return None, ""
+    pool = effect_pool(theme_name, intensity)
+    if previous is None or len(pool) < 2:
+        variant = random.randrange(len(pool))
+    else:
+        variant = random.randrange(len(pool) - 1)
+        variant += variant >= previous
+    return variant, pool[variant]
@@ -0,0 +1,96 @@
+# export.py
+# ShopImpact - chunked CSV / JSONL / Parquet export straight from the ledger (optionally gzip-compressed)
+
+import gzip
+import io
+
+import numpy as np
+
+from ledger import COLUMNS
+
+# format -> (mime type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+CHUNK_ROWS = 50_000
+
+
+def _chunks(rows, chunk_rows):
+    for start in range(0, len(rows), chunk_rows):
+        yield rows[start:start + chunk_rows]
+
+
+def _chunk_frame(ledger, rows):
+    frame = ledger.rows_frame(rows)
+    frame["date"] = np.datetime_as_string(ledger.column("date")[rows], unit="D")
+    return frame
+
+
+def iter_csv(ledger, rows, chunk_rows=CHUNK_ROWS):
+    # header first, then one encoded block per chunk; at most one chunk is materialised at a time
+    yield (",".join(COLUMNS) + "\n").encode("utf-8")
+    for chunk in _chunks(rows, chunk_rows):
+        yield _chunk_frame(ledger, chunk).to_csv(index=False, header=False).encode("utf-8")
+
+
+def iter_jsonl(ledger, rows, chunk_rows=CHUNK_ROWS):
+    for chunk in _chunks(rows, chunk_rows):
+        text = _chunk_frame(ledger, chunk).to_json(orient="records", lines=True, force_ascii=False)
+        yield (text if text.endswith("\n") else text + "\n").encode("utf-8")
+
+
+def write_parquet(ledger, rows, out, chunk_rows=CHUNK_ROWS, compression="snappy"):
+    # one row group per chunk
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            table = pa.Table.from_pandas(_chunk_frame(ledger, chunk), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema, compression=compression)
+            writer.write_table(table)
+        if writer is None:
+            empty = pa.Table.from_pandas(_chunk_frame(ledger, rows[:0]), preserve_index=False)
+            pq.write_table(empty, out, compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def stream_export(ledger, rows, fmt, out, compress=False, chunk_rows=CHUNK_ROWS):
+    # write the export of `rows` into the binary file-like `out`
+    if fmt == "parquet":
+        # parquet compresses internally; gzip the pages instead of the container
+        write_parquet(ledger, rows, out, chunk_rows, compression="gzip" if compress else "snappy")
+        return
+    if fmt == "csv":
+        blocks = iter_csv(ledger, rows, chunk_rows)
+    elif fmt == "jsonl":
+        blocks = iter_jsonl(ledger, rows, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format {fmt!r} (choose from {', '.join(FORMATS)})")
+    sink = gzip.GzipFile(fileobj=out, mode="wb", mtime=0) if compress else out
+    try:
+        for block in blocks:
+            sink.write(block)
+    finally:
+        if compress:
+            sink.close()
+
+
+def export_bytes(ledger, rows, fmt, compress=False):
+    buf = io.BytesIO()
+    stream_export(ledger, rows, fmt, buf, compress=compress)
+    return buf.getvalue()
+
+
+def export_filename(base, fmt, compress=False):
+    name = f"{base}.{FORMATS[fmt][1]}"
+    return name + ".gz" if compress and fmt != "parquet" else name
+
+
+def export_mime(fmt, compress=False):
+    return "application/gzip" if compress and fmt != "parquet" else FORMATS[fmt][0]
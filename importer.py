@@ -0,0 +1,250 @@
+# importer.py
+# ShopImpact - bulk import of bank / receipt exports (CSV or JSONL), parsed in chunks with vectorised impact
+
+import io
+import itertools
+import json
+import time
+
+import numpy as np
+
+from ledger import COLUMNS
+
+# accepted source column names per purchase field (compared case-insensitively)
+COLUMN_ALIASES = {
+    "date": ["date", "purchase date", "transaction date", "posted date", "posting date", "booking date"],
+    "product_type": ["product_type", "category", "product category", "type"],
+    "product_name": ["product_name", "product", "item", "description", "details", "memo", "name"],
+    "brand": ["brand", "merchant", "payee", "vendor", "store", "shop", "retailer"],
+    "price": ["price", "amount", "total", "debit", "value", "cost"],
+    "eco_brand": ["eco_brand", "eco", "eco brand", "ethical"],
+}
+REQUIRED = ("date", "brand", "price")
+TRUTHY = {"1", "true", "yes", "y", "t", "eco"}
+# how purchases are booked in the file: receipts list them as positive amounts, bank exports as negative debits
+DEBIT_SIGNS = ("positive", "negative")
+
+_ISO_DATE = r"^\d{4}-\d{2}-\d{2}"
+# a trailing UTC offset / zone ("-0500", "+02:00", "Z", "GMT"): dropped, the date is the one written down
+_UTC_OFFSET = r"\s*(?:[+-]\d{2}:?\d{2}|Z|UTC|GMT)$"
+# "1,250" / "1,250.00" (thousands commas) vs "12,50" / "1.234,56" (decimal comma)
+_THOUSANDS_COMMA = r"^-?\d{1,3}(,\d{3})+(\.\d+)?$"
+_DECIMAL_COMMA = r"^-?(\d{1,3}(\.\d{3})+|\d+),\d{1,2}$"
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_added = 0
+        self.errors = []  # (row number, message), capped at max_errors
+        self.error_count = 0
+        self.seconds = 0.0
+
+    def errors_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.errors, columns=["row", "error"])
+
+
+def guess_mapping(columns):
+    # purchase field -> source column, using the first alias present in the file
+    lookup = {str(c).strip().lower(): c for c in columns}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                mapping[field] = lookup[alias]
+                break
+    return mapping
+
+
+def peek_columns(source, fmt="csv"):
+    # header of an uploaded file without consuming it
+    start = source.tell()
+    try:
+        if fmt == "jsonl":
+            line = source.readline()
+            return list(json.loads(line).keys()) if line.strip() else []
+        import pandas as pd
+        return list(pd.read_csv(source, nrows=0).columns)
+    finally:
+        source.seek(start)
+
+
+def parse_dates(raw, dayfirst=False):
+    # naive datetimes, NaT where unreadable. the calendar date is kept as written: a purchase at
+    # 2024-03-31T22:30-05:00 belongs to 31 March, not to 1 April in UTC, so offsets are never applied.
+    # ISO dates are always year-month-day; other layouts use the format pandas infers from the first
+    # of them, read day-first when asked
+    import pandas as pd
+    text = raw.astype("string").str.strip()
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+    iso = text.str.match(_ISO_DATE).fillna(False).astype(bool)
+    if iso.any():
+        parsed[iso] = pd.to_datetime(text[iso].str[:10], format="%Y-%m-%d", errors="coerce")
+    rest = ~iso & text.notna() & (text != "")
+    if rest.any():
+        local = text[rest].str.replace(_UTC_OFFSET, "", regex=True)
+        parsed[rest] = pd.to_datetime(local, dayfirst=dayfirst, errors="coerce")
+    return parsed
+
+
+def parse_amounts(raw):
+    # numbers as they are; strings with currency symbols, thousands separators, a decimal comma or
+    # accounting brackets "(12.50)" are cleaned up; anything still ambiguous stays NaN
+    import pandas as pd
+    amount = pd.to_numeric(raw, errors="coerce")
+    retry = amount.isna() & raw.notna()
+    if retry.any():
+        text = raw[retry].astype(str).str.replace(r"[^0-9,.()\-]", "", regex=True)
+        negative = text.str.startswith("(")
+        text = text.str.strip("()")
+        commas = text.str.contains(",", regex=False)
+        if commas.any():
+            sub = text[commas]
+            thousands, decimal = sub.str.match(_THOUSANDS_COMMA), sub.str.match(_DECIMAL_COMMA)
+            text[commas] = sub.str.replace(",", "", regex=False).where(
+                thousands, sub.str.replace(".", "", regex=False).str.replace(",", ".", regex=False).where(decimal, ""))
+        value = pd.to_numeric(text, errors="coerce")
+        amount[retry] = value.where(~negative, -value)
+    return amount
+
+
+def read_chunks(source, fmt="csv", chunk_rows=100_000, mapping=None):
+    import pandas as pd
+    if fmt == "csv":
+        # parse only the mapped columns; text fields stay strings, prices go through the C number parser
+        usecols = list(dict.fromkeys(mapping.values())) if mapping else None
+        text = {mapping[f]: str for f in ("product_type", "product_name", "brand", "eco_brand") if mapping and f in mapping}
+        return pd.read_csv(source, chunksize=chunk_rows, usecols=usecols, dtype=text, skipinitialspace=True)
+    if fmt == "jsonl":
+        return pd.read_json(source, lines=True, chunksize=chunk_rows, dtype=False)
+    raise ValueError(f"Unknown import format {fmt!r} (use 'csv' or 'jsonl')")
+
+
+def prepare_chunk(chunk, mapping, profile, first_row, result, max_errors=1000, default_category="Other",
+                  categorizer=None, brands=None, dayfirst=False, debits="positive"):
+    # validate and normalise one chunk; returns {column: array} for the valid rows, in ledger COLUMNS order.
+    # rows booked with the other sign than `debits` (refunds, salary, transfers in) are skipped, not imported.
+    # with a categorizer, missing / unrecognised categories are inferred from product name + brand;
+    # with a brand registry, brand spellings are canonicalised and known eco brands flagged
+    import pandas as pd
+    n = len(chunk)
+    problems = []
+
+    def source(field):
+        col = mapping.get(field)
+        return chunk[col] if col is not None else None
+
+    dates = parse_dates(source("date"), dayfirst)
+    problems.append((dates.isna().to_numpy(), "unreadable date (DD/MM/YYYY needs 'Day-first dates')" if not dayfirst
+                     else "unreadable date"))
+
+    price = parse_amounts(source("price"))
+    problems.append((price.isna().to_numpy(), "price is not a number"))
+    if debits == "negative":
+        # bank exports book purchases as negative debits; the ledger stores the amount spent
+        price = -price
+    problems.append(((price < 0).to_numpy(), "credit or refund, not a purchase"))
+
+    brand = source("brand").fillna("").astype(str).str.strip()
+    problems.append(((brand == "").to_numpy(), "brand is required"))
+    known_eco = None
+    if brands is not None:
+        canonical, known_eco = brands.canonicalize_many(brand.to_numpy(dtype=object))
+        brand = pd.Series(canonical, index=chunk.index)
+
+    name = source("product_name")
+    name = name.fillna("").astype(str).str.strip().replace("", "—") if name is not None else pd.Series("—", index=chunk.index)
+
+    category = source("product_type")
+    if category is None:
+        category = pd.Series("", index=chunk.index)
+    category = category.fillna("").astype(str).str.strip()
+    # vectorised multiplier lookup; unknown categories are inferred or fall back to the default
+    table = dict(profile.table)
+    multiplier = category.map(table)
+    unknown = multiplier.isna()
+    if unknown.any():
+        fill = default_category
+        if categorizer is not None:
+            fill, _ = categorizer.categorize_many(name[unknown].to_numpy(dtype=object), brand[unknown].to_numpy(dtype=object),
+                                                  default=default_category)
+        category = category.copy()
+        category[unknown] = fill
+        multiplier = category.map(table).fillna(profile.get(default_category))
+
+    eco = source("eco_brand")
+    eco = eco.astype(str).str.strip().str.lower().isin(TRUTHY) if eco is not None else pd.Series(False, index=chunk.index)
+    if known_eco is not None:
+        eco = eco | known_eco
+
+    bad = np.zeros(n, dtype=bool)
+    for mask, _ in problems:
+        bad |= mask
+    if bad.any():
+        result.error_count += int(bad.sum())
+        for pos in np.flatnonzero(bad):
+            if len(result.errors) >= max_errors:
+                break
+            reasons = "; ".join(msg for mask, msg in problems if mask[pos])
+            result.errors.append((first_row + int(pos) + 1, reasons))
+    good = ~bad
+    price = price.to_numpy(dtype=np.float64)[good]
+    return {
+        "date": dates.to_numpy()[good].astype("datetime64[D]"),
+        "product_type": category.to_numpy(dtype=object)[good],
+        "product_name": name.to_numpy(dtype=object)[good],
+        "brand": brand.to_numpy(dtype=object)[good],
+        "price": price,
+        "impact": np.round(price * multiplier.to_numpy(dtype=np.float64)[good], 2),
+        "eco_brand": eco.to_numpy(dtype=bool)[good],
+        "multiplier_version": profile.version,
+    }
+
+
+def import_purchases(ledger, source, profile, fmt="csv", mapping=None, chunk_rows=100_000,
+                     progress=None, persist=None, max_errors=1000, categorizer=None, brands=None, dayfirst=False,
+                     debits="positive"):
+    # stream `source` into the ledger chunk by chunk.
+    # progress(fraction or None, rows_read) is called after every chunk; persist(rows) receives
+    # the valid rows of each chunk as tuples in ledger COLUMNS order; impacts use `profile`;
+    # categorizer (a CategoryIndex) fills in missing or unknown categories, brands (a BrandRegistry)
+    # canonicalises brand names and marks known eco brands; dayfirst reads 05/03/2024 as 5 March;
+    # debits says which sign purchases carry in the file (the other sign is skipped)
+    if debits not in DEBIT_SIGNS:
+        raise ValueError(f"Unknown debit sign {debits!r} (choose from {', '.join(DEBIT_SIGNS)})")
+    result = ImportResult()
+    started = time.perf_counter()
+    size = _size(source)
+    if mapping is None:
+        mapping = guess_mapping(peek_columns(source, fmt))
+    missing = [f for f in REQUIRED if f not in mapping]
+    if missing:
+        raise ValueError("Missing required column(s): " + ", ".join(missing))
+    for chunk in read_chunks(source, fmt, chunk_rows, mapping):
+        clean = prepare_chunk(chunk, mapping, profile, result.rows_read, result, max_errors,
+                              categorizer=categorizer, brands=brands, dayfirst=dayfirst, debits=debits)
+        result.rows_read += len(chunk)
+        added = len(clean["price"])
+        if added:
+            # stored first, so a failed write leaves the ledger holding only what the store has
+            if persist is not None:
+                days = np.datetime_as_string(clean["date"], unit="D").tolist()
+                persist(zip(days, *(clean[c].tolist() for c in COLUMNS[1:-1]), itertools.repeat(profile.version)))
+            ledger.append_columns(*(clean[c] for c in COLUMNS))
+            result.rows_added += added
+        if progress is not None:
+            progress(min(source.tell() / size, 1.0) if size else None, result.rows_read)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _size(source):
+    try:
+        pos = source.tell()
+        source.seek(0, io.SEEK_END)
+        size = source.tell()
+        source.seek(pos)
+        return size
+    except (AttributeError, OSError):
+        return None
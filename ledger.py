@@ -0,0 +1,293 @@
+# ledger.py
+# ShopImpact - columnar, append-only purchase ledger (replaces the list of dicts in session state)
+
+from typing import NamedTuple
+
+import numpy as np
+
+from aggregates import MonthlyAggregates, month_of
+from multipliers import DEFAULT_PROFILE
+
+COLUMNS = ["date", "product_type", "product_name", "brand", "price", "impact", "eco_brand", "multiplier_version"]
+
+# storage dtype per column; product_type / brand hold int32 codes into a category list
+DTYPES = {
+    "date": "datetime64[D]",
+    "product_type": np.int32,
+    "product_name": object,
+    "brand": np.int32,
+    "price": np.float64,
+    "impact": np.float64,
+    "eco_brand": np.bool_,
+    "multiplier_version": np.int32,
+}
+CATEGORICAL = ("product_type", "brand", "multiplier_version")
+# bulk appends at least this long are factorised with pandas
+LARGE_BATCH = 50_000
+# derived index columns kept alongside the data (not part of the frame view)
+INDEX_DTYPES = {"month": "datetime64[M]"}
+
+
+class HistoryFilter(NamedTuple):
+    # every field is optional; None / empty means "don't filter on it". Hashable, so it doubles as a cache key.
+    month: str = None          # "YYYY-MM"
+    category: str = None
+    start: object = None       # inclusive date bounds (date / ISO string)
+    end: object = None
+    brands: tuple = ()
+    min_price: float = None
+    max_price: float = None
+    eco: bool = None
+
+
+class PurchaseLedger:
+    def __init__(self, capacity=64):
+        self._n = 0
+        self._cap = max(int(capacity), 1)
+        self._cols = {c: np.empty(self._cap, dtype=DTYPES[c]) for c in COLUMNS}
+        self._cols.update({c: np.empty(self._cap, dtype=dt) for c, dt in INDEX_DTYPES.items()})
+        # category lists (code -> label) and reverse lookups (label -> code)
+        self.categories = {c: [] for c in CATEGORICAL}
+        self._codes = {c: {} for c in CATEGORICAL}
+        # running per-month totals, kept in step with every append
+        self.monthly = MonthlyAggregates()
+        # bumped on every change; cached views compare against it
+        self.version = 0
+        self._frame = None
+        self._frame_version = -1
+        self._selections = {}
+        # profile version -> impacts recomputed under that profile / (rows covered, aggregates)
+        self._recomputed = {}
+        self._recomputed_monthly = {}
+
+    def __len__(self):
+        return self._n
+
+    # ----------------------
+    # Writes
+    # ----------------------
+    def _reserve(self, extra):
+        need = self._n + extra
+        if need <= self._cap:
+            return
+        cap = self._cap
+        while cap < need:
+            cap *= 2  # geometric growth -> O(1) amortized appends
+        for c, arr in self._cols.items():
+            grown = np.empty(cap, dtype=arr.dtype)
+            grown[:self._n] = arr[:self._n]
+            self._cols[c] = grown
+        self._cap = cap
+
+    def code_for(self, column, label):
+        codes = self._codes[column]
+        code = codes.get(label)
+        if code is None:
+            code = len(self.categories[column])
+            codes[label] = code
+            self.categories[column].append(label)
+        return code
+
+    def append(self, entry):
+        self._reserve(1)
+        i = self._n
+        cols = self._cols
+        day = np.datetime64(entry["date"], "D")
+        cols["date"][i] = day
+        cols["month"][i] = day.astype("datetime64[M]")
+        cols["product_type"][i] = self.code_for("product_type", entry["product_type"])
+        cols["product_name"][i] = entry["product_name"]
+        cols["brand"][i] = self.code_for("brand", entry["brand"])
+        cols["price"][i] = entry["price"]
+        cols["impact"][i] = entry["impact"]
+        cols["eco_brand"][i] = entry["eco_brand"]
+        cols["multiplier_version"][i] = self.code_for("multiplier_version", entry.get("multiplier_version", DEFAULT_PROFILE.version))
+        self._n += 1
+        self.version += 1
+        self.monthly.add(month_of(day), entry["product_type"], float(entry["price"]), float(entry["impact"]))
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def append_columns(self, date, product_type, product_name, brand, price, impact, eco_brand, multiplier_version):
+        # bulk append of equal-length column arrays: one reserve, slice assignment, one aggregate merge
+        n = len(price)
+        if n == 0:
+            return
+        self._reserve(n)
+        i, j = self._n, self._n + n
+        cols = self._cols
+        days = np.asarray(date, dtype="datetime64[D]")
+        cols["date"][i:j] = days
+        cols["month"][i:j] = days.astype("datetime64[M]")
+        for c, values in (("product_type", product_type), ("brand", brand), ("multiplier_version", multiplier_version)):
+            if isinstance(values, str):
+                cols[c][i:j] = self.code_for(c, values)
+            elif n < LARGE_BATCH:
+                # small batches (e.g. hydrating a profile on the Add Purchase page) don't need pandas
+                cols[c][i:j] = [self.code_for(c, label) for label in values]
+            else:
+                import pandas as pd
+                codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+                lookup = np.array([self.code_for(c, label) for label in uniques], dtype=np.int32)
+                cols[c][i:j] = lookup[codes]
+        cols["product_name"][i:j] = np.asarray(product_name, dtype=object)
+        cols["price"][i:j] = price
+        cols["impact"][i:j] = impact
+        cols["eco_brand"][i:j] = eco_brand
+        self._n = j
+        self.version += 1
+        self.monthly.add_many(days, cols["product_type"][i:j], price, impact, labels=self.labels("product_type"))
+
+    def rebuild_aggregates(self):
+        # recompute the monthly aggregates from the raw columns
+        return MonthlyAggregates.rebuild(self.column("date"), self.column("product_type"),
+                                         self.column("price"), self.column("impact"), labels=self.labels("product_type"))
+
+    def verify_aggregates(self):
+        return self.monthly.matches(self.rebuild_aggregates())
+
+    # ----------------------
+    # Impacts under another multiplier profile
+    # ----------------------
+    def impacts_under(self, profile):
+        # vectorised recompute; the ledger is append-only, so a cached result only needs its new tail
+        cached = self._recomputed.get(profile.version)
+        done = 0 if cached is None else len(cached)
+        if done < self._n:
+            lookup = profile.vector(self.categories["product_type"])
+            tail = np.round(self.column("price")[done:] * lookup[self.column("product_type")[done:]], 2)
+            cached = tail if cached is None else np.concatenate([cached, tail])
+            cached.flags.writeable = False
+            self._recomputed[profile.version] = cached
+        return cached
+
+    def monthly_under(self, profile):
+        # MonthlyAggregates as if every purchase had been logged with `profile`
+        done, agg = self._recomputed_monthly.get(profile.version, (0, None))
+        if agg is None:
+            agg = MonthlyAggregates()
+        if done < self._n:
+            impacts = self.impacts_under(profile)
+            agg.add_many(self.column("date")[done:], self.column("product_type")[done:], self.column("price")[done:],
+                         impacts[done:], labels=self.labels("product_type"))
+            self._recomputed_monthly[profile.version] = (self._n, agg)
+        return agg
+
+    def recorded_versions(self):
+        # multiplier versions present in the ledger, with row counts
+        counts = np.bincount(self.column("multiplier_version"), minlength=len(self.categories["multiplier_version"]))
+        return {v: int(n) for v, n in zip(self.categories["multiplier_version"], counts) if n}
+
+    # ----------------------
+    # Reads
+    # ----------------------
+    def column(self, name):
+        # read-only view over the filled part of a column (codes for categoricals)
+        view = self._cols[name][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def labels(self, name):
+        return np.asarray(self.categories[name], dtype=object)
+
+    def mask(self, flt):
+        # boolean row mask for a HistoryFilter, built from vectorised comparisons on the columns
+        keep = np.ones(self._n, dtype=bool)
+        if flt.month is not None:
+            keep &= self.column("month") == np.datetime64(flt.month, "M")
+        if flt.category is not None:
+            code = self._codes["product_type"].get(flt.category)
+            if code is None:
+                return np.zeros(self._n, dtype=bool)
+            keep &= self.column("product_type") == code
+        if flt.start is not None:
+            keep &= self.column("date") >= np.datetime64(flt.start, "D")
+        if flt.end is not None:
+            keep &= self.column("date") <= np.datetime64(flt.end, "D")
+        if flt.brands:
+            codes = [self._codes["brand"][b] for b in flt.brands if b in self._codes["brand"]]
+            keep &= np.isin(self.column("brand"), codes)
+        if flt.min_price is not None:
+            keep &= self.column("price") >= flt.min_price
+        if flt.max_price is not None:
+            keep &= self.column("price") <= flt.max_price
+        if flt.eco is not None:
+            keep &= self.column("eco_brand") == flt.eco
+        return keep
+
+    def _remember(self, key, compute):
+        # small per-version memo for row selections / orderings
+        key = (self.version, *key)
+        rows = self._selections.get(key)
+        if rows is None:
+            if len(self._selections) >= 32:
+                self._selections.clear()
+            rows = self._selections[key] = compute()
+            rows.flags.writeable = False
+        return rows
+
+    def select(self, flt):
+        # row positions matching flt; remembered per ledger version so plain reruns skip the scan
+        return self._remember(("select", flt), lambda: np.flatnonzero(self.mask(flt)))
+
+    def _sort_values(self, name):
+        values = self.column(name)
+        if name in CATEGORICAL:
+            # order codes by their label, not by first appearance
+            rank = np.empty(len(self.categories[name]), dtype=np.int64)
+            rank[np.argsort(self.labels(name), kind="stable")] = np.arange(len(rank))
+            return rank[values]
+        return values
+
+    def sorted_rows(self, flt, sort_by="date", ascending=True):
+        def compute():
+            rows = self.select(flt)
+            order = np.argsort(self._sort_values(sort_by)[rows], kind="stable")
+            return rows[order if ascending else order[::-1]]
+        return self._remember(("sorted", flt, sort_by, ascending), compute)
+
+    def summarize(self, flt):
+        # (count, total_spend, total_impact) for a filter, answered from the aggregates when they cover it
+        if flt == HistoryFilter():
+            return self.monthly.totals()
+        if flt._replace(month=None, category=None) == HistoryFilter() and flt.month is not None:
+            if flt.category is None:
+                row = self.monthly.months.get(flt.month)
+            else:
+                row = self.monthly.by_category.get(flt.month, {}).get(flt.category)
+            return tuple(row) if row else (0, 0.0, 0.0)
+        rows = self.select(flt)
+        return len(rows), float(self.column("price")[rows].sum()), float(self.column("impact")[rows].sum())
+
+    def category_totals(self, rows):
+        # [(category, total_impact)] over the given rows, largest first
+        sums = np.bincount(self.column("product_type")[rows], weights=self.column("impact")[rows],
+                           minlength=len(self.categories["product_type"]))
+        order = np.argsort(-sums, kind="stable")
+        return [(self.categories["product_type"][i], float(sums[i])) for i in order if sums[i] > 0]
+
+    def page(self, flt, sort_by="date", ascending=True, offset=0, limit=50):
+        # only the visible window is materialised as a DataFrame
+        rows = self.sorted_rows(flt, sort_by, ascending)
+        return self.rows_frame(rows[offset:offset + limit])
+
+    def rows_frame(self, rows):
+        # DataFrame for the given row positions (index = position in the ledger)
+        import pandas as pd
+        data = {}
+        for c in COLUMNS:
+            values = self._cols[c][:self._n][rows]
+            if c in CATEGORICAL:
+                data[c] = pd.Categorical.from_codes(values, categories=self.categories[c])
+            else:
+                data[c] = values
+        return pd.DataFrame(data, index=np.asarray(rows), columns=COLUMNS)
+
+    def frame(self):
+        # cached DataFrame view, rebuilt only when rows changed; treat it as read-only
+        if self._frame is None or self._frame_version != self.version:
+            self._frame = self.rows_frame(np.arange(self._n))
+            self._frame_version = self.version
+        return self._frame
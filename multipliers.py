@@ -0,0 +1,109 @@
+# multipliers.py
+# ShopImpact - immutable, versioned multiplier profiles and per-user overrides
+
+import hashlib
+import json
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+# CO₂ units per unit of spend, by product category
+DEFAULT_MULTIPLIERS = {
+    "Clothing (Fast Fashion)": 0.12,
+    "Clothing (Sustainable/Second-Hand)": 0.03,
+    "Footwear (Leather)": 0.20,
+    "Footwear (Synthetic)": 0.14,
+    "Electronics": 0.35,
+    "Groceries (Packaged)": 0.08,
+    "Groceries (Fresh/Local)": 0.02,
+    "Personal Care": 0.06,
+    "Furniture": 0.25,
+    "Beverages (Single-Use Bottle)": 0.09,
+    "Books & Stationery": 0.02,
+    "Home Appliances": 0.30,
+    "Other": 0.10
+}
+FALLBACK_CATEGORY = "Other"
+
+
+def table_version(table):
+    # content hash: identical tables always share a version id
+    payload = json.dumps(sorted((k, round(float(v), 6)) for k, v in table.items()))
+    return "v-" + hashlib.sha1(payload.encode()).hexdigest()[:10]
+
+
+class MultiplierProfile:
+    __slots__ = ("name", "table", "version")
+
+    def __init__(self, name, table):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "table", MappingProxyType({k: float(v) for k, v in table.items()}))
+        object.__setattr__(self, "version", table_version(self.table))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("MultiplierProfile is immutable; use with_overrides()")
+
+    def __repr__(self):
+        return f"MultiplierProfile({self.name!r}, {self.version})"
+
+    def get(self, category):
+        return self.table.get(category, self.table[FALLBACK_CATEGORY])
+
+    def with_overrides(self, overrides, name=None):
+        return MultiplierProfile(name or f"{self.name} (custom)", {**self.table, **overrides})
+
+    def vector(self, categories):
+        # multiplier per category label, aligned with `categories` (for code -> multiplier lookups)
+        return np.array([self.get(c) for c in categories], dtype=np.float64)
+
+
+DEFAULT_PROFILE = MultiplierProfile("Default", DEFAULT_MULTIPLIERS)
+# read-only view of the shipped factors (category list, defaults)
+MULTIPLIERS = DEFAULT_PROFILE.table
+
+
+class ProfileRegistry:
+    # process-wide: every profile ever used (by version) and each named user's active override.
+    # with a store, both are saved there and reloaded on start, so recorded versions stay resolvable
+    def __init__(self, store=None):
+        self._lock = threading.Lock()
+        self._store = store
+        self._versions = {DEFAULT_PROFILE.version: DEFAULT_PROFILE}
+        self._active = {}
+        if store is not None:
+            for profile in store.load_profiles():
+                self._versions.setdefault(profile.version, profile)
+            self._active = {user_id: self._versions[version] for user_id, version in store.load_assignments().items()
+                            if version in self._versions}
+
+    def register(self, profile):
+        # saved before it's known here, so a failed store write can be retried by registering again
+        known = self._versions.get(profile.version)
+        if known is not None:
+            return known
+        if self._store is not None:
+            self._store.save_profile(profile)
+        with self._lock:
+            return self._versions.setdefault(profile.version, profile)
+
+    def get(self, version):
+        return self._versions.get(version)
+
+    def versions(self):
+        return list(self._versions.values())
+
+    def active_for(self, user_id):
+        return self._active.get(user_id, DEFAULT_PROFILE)
+
+    def assign(self, user_id, profile):
+        profile = self.register(profile)
+        default = profile.version == DEFAULT_PROFILE.version
+        if self._store is not None:
+            self._store.save_assignment(user_id, None if default else profile.version)
+        with self._lock:
+            if default:
+                self._active.pop(user_id, None)
+            else:
+                self._active[user_id] = profile
+        return profile
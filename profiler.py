@@ -0,0 +1,163 @@
+# profiler.py
+# ShopImpact - opt-in rerun profiler: timed spans, bytes sent per output channel, rolling per-session stats
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullProfiler:
+    # stand-in used while profiling is off: every hook is a constant-time no-op
+    enabled = False
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def start(self, name):
+        return None
+
+    def stop(self, token):
+        pass
+
+    def add_text(self, channel, text):
+        pass
+
+    def add_frame(self, channel, df):
+        pass
+
+    def begin_rerun(self):
+        pass
+
+    def end_rerun(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, window=100):
+        # one dict per finished rerun: {"spans": {name: seconds}, "bytes": {channel: n}}
+        self.reruns = deque(maxlen=window)
+        self._rerun_started = time.perf_counter()
+        self._spans = {}
+        self._bytes = {}
+
+    # ----------------------
+    # Hooks
+    # ----------------------
+    def span(self, name):
+        return _Span(self, name)
+
+    def start(self, name):
+        return (name, time.perf_counter())
+
+    def stop(self, token):
+        name, started = token
+        self._record(name, time.perf_counter() - started)
+
+    def _record(self, name, seconds):
+        self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    def add_bytes(self, channel, n):
+        self._bytes[channel] = self._bytes.get(channel, 0) + n
+
+    def add_text(self, channel, text):
+        self.add_bytes(channel, len(text.encode()))
+
+    def add_frame(self, channel, df):
+        # in-memory size of the frame handed to Streamlit (a proxy for its serialized payload);
+        # plain lists of row dicts are counted by their text size
+        if hasattr(df, "memory_usage"):
+            self.add_bytes(channel, int(df.memory_usage(index=True, deep=True).sum()))
+        else:
+            self.add_bytes(channel, sum(len(str(row)) for row in df))
+
+    def begin_rerun(self):
+        # drops whatever an interrupted rerun (st.rerun, exception) left behind
+        self._spans, self._bytes = {}, {}
+        self._rerun_started = time.perf_counter()
+
+    def end_rerun(self):
+        self._record("rerun", time.perf_counter() - self._rerun_started)
+        self.reruns.append({"spans": self._spans, "bytes": self._bytes})
+        self._spans, self._bytes = {}, {}
+
+    # ----------------------
+    # Rolling stats & export
+    # ----------------------
+    def stats(self):
+        spans, sent = {}, {}
+        for rerun in self.reruns:
+            for name, seconds in rerun["spans"].items():
+                spans.setdefault(name, []).append(seconds)
+            for channel, n in rerun["bytes"].items():
+                sent.setdefault(channel, []).append(n)
+        return {
+            "reruns": len(self.reruns),
+            "spans": {name: _summary(values) for name, values in sorted(spans.items())},
+            "bytes": {channel: _summary(values) for channel, values in sorted(sent.items())},
+        }
+
+    def to_json(self):
+        return json.dumps(self.stats(), indent=2)
+
+    def to_prometheus(self, prefix="shopimpact"):
+        stats = self.stats()
+        lines = []
+        for metric, key, label, help_text in (
+            (f"{prefix}_span_seconds", "spans", "span", "Time spent per rerun section (rolling window)"),
+            (f"{prefix}_sent_bytes", "bytes", "channel", "Bytes handed to Streamlit per rerun (rolling window)"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for name, s in stats[key].items():
+                name = name.replace("\\", "\\\\").replace('"', '\\"')
+                for quantile, stat in (("0.5", "p50"), ("0.95", "p95")):
+                    lines.append(f'{metric}{{{label}="{name}",quantile="{quantile}"}} {s[stat]:.6g}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {s["sum"]:.6g}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _summary(values):
+    arr = np.asarray(values, dtype=np.float64)
+    return {
+        "count": int(arr.size),
+        "sum": float(arr.sum()),
+        "mean": float(arr.mean()),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "max": float(arr.max()),
+    }
@@ -0,0 +1,35 @@
+# report_workers.py
+# ShopImpact - start method for the report pool: spawn (the server process has threads: writer, rollups,
+# Tornado), without re-running the parent's main script in every worker. Imported on first use, so the
+# multiprocessing machinery stays out of a cold start.
+
+import sys
+import threading
+import types
+from multiprocessing.context import SpawnContext, SpawnProcess
+
+# spawn re-executes sys.modules["__main__"] in each new worker. under Streamlit that is app.py, which would
+# build the page and open the store (writer and rollup threads) in every worker, so workers start while
+# __main__ is this bare module instead
+_BARE_MAIN = types.ModuleType("__main__")
+_LAUNCH_LOCK = threading.Lock()
+
+
+class ReportWorker(SpawnProcess):
+    def start(self):
+        with _LAUNCH_LOCK:
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = _BARE_MAIN
+            try:
+                super().start()
+            finally:
+                # unless a Streamlit rerun installed its own __main__ meanwhile
+                if sys.modules["__main__"] is _BARE_MAIN:
+                    sys.modules["__main__"] = main
+
+
+class ReportContext(SpawnContext):
+    Process = ReportWorker
+
+
+CONTEXT = ReportContext()
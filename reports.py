@@ -0,0 +1,225 @@
+# reports.py
+# ShopImpact - multi-page PDF / PNG reports (summary, monthly charts, top categories, badges), rendered in
+# worker processes with matplotlib's Figure API and cached on a hash of their contents.
+
+import hashlib
+import io
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# format -> (mime type, file extension)
+REPORT_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "png": ("image/png", "png"),
+}
+# per-job budget: the payload is capped before it leaves the session, the output and render time in the worker
+MAX_MONTHS = 36
+MAX_CATEGORIES = 12
+MAX_BADGES = 12
+MAX_BYTES = 8 * 1024 * 1024
+TIME_BUDGET = 20.0
+
+PAGE_SIZE = (11.69, 8.27)  # A4 landscape, inches
+# emoji (outside the Basic Multilingual Plane) and emoji variation selectors: the report font (DejaVu Sans)
+# has no glyphs for them, so they'd print as empty boxes
+_NO_GLYPH = re.compile("[\U00010000-\U0010FFFF\uFE0F]")
+SPEND_COLOR = "#1f9e4a"
+IMPACT_COLOR = "#0b7fa3"
+
+
+def describe_filter(flt):
+    parts = [f"{name.replace('_', ' ')}: {', '.join(map(str, value)) if isinstance(value, tuple) else value}"
+             for name, value in flt._asdict().items() if value is not None and value != ()]
+    return "; ".join(parts) or "all purchases"
+
+
+def printable(text):
+    return " ".join(_NO_GLYPH.sub("", text).split())
+
+
+def report_payload(ledger, flt, badge_for, title="ShopImpact Report"):
+    # everything a worker needs as plain arrays / strings, bounded by MAX_* whatever the ledger size
+    rows = ledger.select(flt)
+    months, inverse = np.unique(ledger.column("date")[rows].astype("datetime64[M]"), return_inverse=True)
+    count = np.bincount(inverse, minlength=len(months))
+    spend = np.bincount(inverse, weights=ledger.column("price")[rows], minlength=len(months))
+    impact = np.bincount(inverse, weights=ledger.column("impact")[rows], minlength=len(months))
+    keep = slice(-MAX_MONTHS, None)
+    labels = np.datetime_as_string(months, unit="M")
+    return {
+        "title": title,
+        "filters": describe_filter(flt),
+        "totals": (len(rows), float(spend.sum()), float(impact.sum())),
+        "months": labels[keep],
+        "month_count": count[keep],
+        "month_spend": spend[keep],
+        "month_impact": impact[keep],
+        "categories": ledger.category_totals(rows)[:MAX_CATEGORIES],
+        "badges": [(m, float(i), *map(printable, badge_for(i))) for m, i in zip(labels[-MAX_BADGES:], impact[-MAX_BADGES:])],
+    }
+
+
+def report_key(payload, fmt):
+    # filter + data hash: identical reports requested by any session share one render
+    return fmt + ":" + hashlib.blake2b(pickle.dumps((fmt, payload), protocol=5), digest_size=16).hexdigest()
+
+
+# ----------------------
+# Pages (each draws onto a Figure or SubFigure)
+# ----------------------
+def _summary_page(fig, p):
+    count, spend, impact = p["totals"]
+    fig.suptitle(p["title"], fontsize=20, fontweight="bold")
+    lines = [f"Filters: {p['filters']}", "",
+             f"Purchases: {count}", f"Total spend: {spend:.2f}", f"Estimated CO₂: {impact:.2f}",
+             f"Average CO₂ per item: {(impact / count if count else 0):.2f}"]
+    if len(p["months"]):
+        lines += ["", f"Months covered: {p['months'][0]} – {p['months'][-1]}"]
+    if p["badges"]:
+        month, _, badge, msg = p["badges"][-1]
+        lines += ["", f"Badge for {month}: {badge}", msg]
+    fig.text(0.08, 0.82, "\n".join(lines), fontsize=14, va="top", linespacing=1.6)
+
+
+def _monthly_page(fig, p):
+    fig.suptitle("Monthly spend and CO₂", fontsize=16, fontweight="bold")
+    spend_ax, impact_ax = fig.subplots(2, 1, sharex=True)
+    months = list(p["months"])
+    spend_ax.bar(months, p["month_spend"], color=SPEND_COLOR)
+    spend_ax.set_ylabel("Spend")
+    impact_ax.plot(months, p["month_impact"], marker="o", color=IMPACT_COLOR)
+    impact_ax.set_ylabel("Estimated CO₂")
+    impact_ax.tick_params(axis="x", labelrotation=45)
+
+
+def _categories_page(fig, p):
+    fig.suptitle("Top categories by CO₂", fontsize=16, fontweight="bold")
+    ax = fig.subplots()
+    names = [c for c, _ in p["categories"]][::-1]
+    ax.barh(names, [v for _, v in p["categories"]][::-1], color=IMPACT_COLOR)
+    ax.set_xlabel("Estimated CO₂")
+
+
+def _badges_page(fig, p):
+    fig.suptitle("Monthly badges", fontsize=16, fontweight="bold")
+    ax = fig.subplots()
+    ax.axis("off")
+    if p["badges"]:
+        cells = [[m, f"{i:.2f}", badge] for m, i, badge, _ in p["badges"]]
+        table = ax.table(cellText=cells, colLabels=["Month", "CO₂", "Badge"], loc="upper center", cellLoc="left")
+        table.scale(1, 1.6)
+
+
+PAGES = [_summary_page, _monthly_page, _categories_page, _badges_page]
+
+
+def render_report(payload, fmt, time_budget=TIME_BUDGET, max_bytes=MAX_BYTES):
+    # runs in a worker process: PDF = one page per section, PNG = every section stacked on one sheet
+    from matplotlib.figure import Figure
+    deadline = time.perf_counter() + time_budget
+
+    def check():
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Report took longer than its {time_budget:.0f}s budget")
+
+    buf = io.BytesIO()
+    if fmt == "pdf":
+        from matplotlib.backends.backend_pdf import PdfPages
+        with PdfPages(buf, metadata={"Title": payload["title"], "CreationDate": None}) as pdf:
+            for draw in PAGES:
+                fig = Figure(figsize=PAGE_SIZE)
+                draw(fig, payload)
+                check()
+                pdf.savefig(fig)
+    elif fmt == "png":
+        fig = Figure(figsize=(PAGE_SIZE[0], PAGE_SIZE[1] * len(PAGES)))
+        for draw, sub in zip(PAGES, fig.subfigures(len(PAGES), 1)):
+            draw(sub, payload)
+            check()
+        fig.savefig(buf, format="png", dpi=80)
+    else:
+        raise ValueError(f"Unknown report format {fmt!r} (choose from {', '.join(REPORT_FORMATS)})")
+    check()
+    data = buf.getvalue()
+    if len(data) > max_bytes:
+        raise RuntimeError(f"Report is {len(data) / 1e6:.1f} MB, over its {max_bytes / 1e6:.1f} MB budget")
+    return data
+
+
+class ReportService:
+    # process-wide: jobs go to a small process pool (matplotlib never runs in the Streamlit process),
+    # finished reports and failures sit in an LRU keyed by report_key; sessions poll by key
+    def __init__(self, workers=2, max_items=16, time_budget=TIME_BUDGET, max_bytes=MAX_BYTES):
+        self.workers = workers
+        self.max_items = max_items
+        self.time_budget = time_budget
+        self.max_bytes = max_bytes
+        self._pool = None
+        self._jobs = {}                # key -> (future, submitted at)
+        self._results = OrderedDict()  # key -> ("done", bytes) | ("failed", message)
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            # imported on first use so the pool machinery stays out of a cold start
+            from concurrent.futures import ProcessPoolExecutor
+            from report_workers import CONTEXT
+            # recycling workers (against slow leaks in long-lived renderers) needs Python 3.11
+            recycle = {"max_tasks_per_child": 100} if sys.version_info >= (3, 11) else {}
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=CONTEXT, **recycle)
+        return self._pool
+
+    def submit(self, payload, fmt):
+        # returns the job key; a report that is already rendered or rendering is not submitted again
+        key = report_key(payload, fmt)
+        with self._lock:
+            if self._results.get(key, ("failed",))[0] == "done" or key in self._jobs:
+                return key
+            self._results.pop(key, None)
+            future = self._executor().submit(render_report, payload, fmt, self.time_budget, self.max_bytes)
+            self._jobs[key] = (future, time.monotonic())
+        return key
+
+    def _finish(self, key, status, value):
+        self._jobs.pop(key, None)
+        self._results[key] = (status, value)
+        while len(self._results) > self.max_items:
+            self._results.popitem(last=False)
+        return status, value
+
+    def poll(self, key):
+        # ("done", bytes) | ("running", seconds since submit) | ("failed", message) | (None, None) if unknown
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+            job = self._jobs.get(key)
+            if job is None:
+                return None, None
+            future, submitted = job
+            elapsed = time.monotonic() - submitted
+            if not future.done():
+                # the worker enforces the budget itself; this only stops waiting on a job stuck in the queue
+                if elapsed > 3 * self.time_budget:
+                    future.cancel()
+                    return self._finish(key, "failed", "Report timed out waiting for a worker")
+                return "running", elapsed
+            error = future.exception()
+            if error is not None:
+                if type(error).__name__ == "BrokenProcessPool":
+                    # a worker died (e.g. out of memory); start a fresh pool on the next submit
+                    self._pool = None
+                return self._finish(key, "failed", str(error) or type(error).__name__)
+            return self._finish(key, "done", future.result())
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,178 @@
+# simulator.py
+# ShopImpact - what-if simulator: substitution / reduction scenarios over a ledger's month x category spend,
+# with Monte Carlo bands on the multipliers. Results are memoised per ledger version.
+
+import weakref
+from typing import NamedTuple
+
+import numpy as np
+
+from multipliers import FALLBACK_CATEGORY, MULTIPLIERS
+
+CATEGORIES = list(MULTIPLIERS)
+# lower-impact swaps offered for each category (spend moves 1:1 to the substitute)
+SUBSTITUTES = {
+    "Clothing (Fast Fashion)": ["Clothing (Sustainable/Second-Hand)"],
+    "Footwear (Leather)": ["Footwear (Synthetic)"],
+    "Groceries (Packaged)": ["Groceries (Fresh/Local)"],
+}
+FRACTIONS = (0.25, 0.5, 0.75, 1.0)
+CUTS = (0.25, 0.5)
+# spread of each multiplier (lognormal sigma, ~25%), and draws per evaluation
+UNCERTAINTY = 0.25
+SAMPLES = 400
+BAND = (5, 95)
+# months of history the annual projection is based on; with fewer than MIN_HISTORY_MONTHS a year scaled up
+# from one or two months (a single first purchase x 12) says nothing, so no projection is offered
+WINDOW_MONTHS = 12
+MIN_HISTORY_MONTHS = 3
+
+
+class Scenario(NamedTuple):
+    name: str
+    moves: tuple  # ((source, target or None to drop the spend, fraction 0..1), ...)
+
+
+def _percent(fraction):
+    return f"{fraction:.0%}"
+
+
+def substitute(source, target, fraction):
+    verb = "Replace all" if fraction >= 1 else f"Replace {_percent(fraction)}"
+    return Scenario(f"{verb} of {source} spend with {target}", ((source, target, fraction),))
+
+
+def cut(category, fraction):
+    name = f"Halve {category} spend" if fraction == 0.5 else f"Cut {category} spend by {_percent(fraction)}"
+    return Scenario(name, ((category, None, fraction),))
+
+
+def candidate_scenarios(substitutes=SUBSTITUTES, fractions=FRACTIONS, cuts=CUTS, categories=CATEGORIES):
+    scenarios = [substitute(s, t, f) for s, targets in substitutes.items() for t in targets for f in fractions]
+    return scenarios + [cut(c, f) for c in categories for f in cuts]
+
+
+# ----------------------
+# Vectorised core
+# ----------------------
+def spend_matrix(monthly, categories=CATEGORIES):
+    # (months, spend[month, category]) from MonthlyAggregates; unknown categories count as the fallback
+    code = {c: i for i, c in enumerate(categories)}
+    fallback = code[FALLBACK_CATEGORY]
+    months = monthly.sorted_months()
+    spend = np.zeros((len(months), len(categories)))
+    for row, month in enumerate(months):
+        for category, (_, total, _) in monthly.by_category.get(month, {}).items():
+            spend[row, code.get(category, fallback)] += total
+    return months, spend
+
+
+def _window(months, window):
+    # (rows inside the last `window` calendar months, calendar months they span)
+    stamps = np.array(months, dtype="datetime64[M]")
+    keep = stamps > stamps[-1] - np.timedelta64(window, "M")
+    return keep, int((stamps[-1] - stamps[keep][0]).astype(int)) + 1
+
+
+def history_months(months, window=WINDOW_MONTHS):
+    # calendar months the annual projection is based on (first to last month with purchases, within the window)
+    return _window(months, window)[1] if months else 0
+
+
+def annual_spend(months, spend, window=WINDOW_MONTHS):
+    # category spend over the last `window` calendar months, scaled to a year when less history exists
+    if not months:
+        return np.zeros(spend.shape[1])
+    keep, span = _window(months, window)
+    return spend[keep].sum(axis=0) * (12 / span)
+
+
+def scenario_weights(scenarios, spend, categories=CATEGORIES):
+    # W[k, c]: spend each scenario adds to (or removes from) category c, so impact change = W @ multipliers.
+    # column len(categories) is "dropped" spend (multiplier 0). `spend` is (C,) or (months, C).
+    code = {c: i for i, c in enumerate(categories)}
+    dropped = len(categories)
+    k, src, dst, frac = [], [], [], []
+    for i, scenario in enumerate(scenarios):
+        for source, target, fraction in scenario.moves:
+            k.append(i)
+            src.append(code[source])
+            dst.append(dropped if target is None else code[target])
+            frac.append(fraction)
+    k, src, dst = (np.array(v, dtype=np.int64) for v in (k, src, dst))
+    moved = np.array(frac) * spend[..., src]  # (..., moves)
+    weights = np.zeros(spend.shape[:-1] + (len(scenarios), dropped + 1))
+    np.add.at(weights, (..., k, dst), moved)
+    np.add.at(weights, (..., k, src), -moved)
+    return weights
+
+
+def multiplier_samples(profile, samples=SAMPLES, sigma=UNCERTAINTY, seed=0, categories=CATEGORIES):
+    # (samples, C + 1) draws around the profile's multipliers; the last column is the "dropped" slot (0)
+    base = np.append(profile.vector(categories), 0.0)
+    rng = np.random.default_rng(seed)
+    noise = rng.lognormal(-sigma ** 2 / 2, sigma, size=(samples, len(base)))  # mean-preserving
+    return base * noise
+
+
+class WhatIf:
+    # ranked projections for one (ledger version, profile, scenario set); savings are CO₂ per year
+    def __init__(self, scenarios, months, spend, profile, samples=SAMPLES, sigma=UNCERTAINTY, seed=0):
+        self.scenarios = scenarios
+        self.months = months
+        self.spend = spend
+        self.multipliers = np.append(profile.vector(CATEGORIES), 0.0)
+        self.history_months = history_months(months)
+        self.annual_spend = annual_spend(months, spend)
+        self.annual_impact = float(self.annual_spend @ self.multipliers[:-1])
+        draws = multiplier_samples(profile, samples, sigma, seed)
+        weights = scenario_weights(scenarios, self.annual_spend)
+        self.savings = -(weights @ self.multipliers)
+        sampled = -(weights @ draws.T)  # (scenarios, samples)
+        self.low, self.high = np.percentile(sampled, BAND, axis=1)
+        baseline = self.annual_spend @ draws[:, :-1].T
+        self.annual_low, self.annual_high = (float(v) for v in np.percentile(baseline, BAND))
+        self.order = np.argsort(-self.savings, kind="stable")
+
+    @property
+    def enough_history(self):
+        return self.history_months >= MIN_HISTORY_MONTHS
+
+    def top(self, n=5, category=None, distinct=True):
+        # [(scenario, saving, low, high)] best first; only scenarios that save something.
+        # distinct: one entry per swap (its best fraction) rather than 100% / 75% / 50% of the same move
+        out, seen = [], set()
+        for i in self.order:
+            if self.savings[i] <= 0 or len(out) >= n:
+                break
+            moves = self.scenarios[i].moves
+            swap = tuple((source, target) for source, target, _ in moves)
+            if (category is None or any(source == category for source, _, _ in moves)) and not (distinct and swap in seen):
+                seen.add(swap)
+                out.append((self.scenarios[i], float(self.savings[i]), float(self.low[i]), float(self.high[i])))
+        return out
+
+    def monthly(self, scenario):
+        # (baseline, projected) impact per month in self.months had `scenario` applied to past spend
+        baseline = self.spend @ self.multipliers[:-1]
+        change = scenario_weights([scenario], self.spend)[:, 0, :] @ self.multipliers
+        return baseline, baseline + change
+
+
+# ledger -> (version, {key: WhatIf}); entries go away with the ledger
+_MEMO = weakref.WeakKeyDictionary()
+
+
+def simulate(ledger, profile, scenarios=None, samples=SAMPLES, sigma=UNCERTAINTY):
+    # memoised per ledger version: reruns on an unchanged ledger reuse the result
+    scenarios = tuple(candidate_scenarios() if scenarios is None else scenarios)
+    key = (profile.version, scenarios, samples, sigma)
+    version, results = _MEMO.get(ledger, (None, None))
+    if version != ledger.version:
+        results = {}
+        _MEMO[ledger] = (ledger.version, results)
+    result = results.get(key)
+    if result is None:
+        months, spend = spend_matrix(ledger.monthly)
+        result = results[key] = WhatIf(scenarios, months, spend, profile, samples, sigma)
+    return result
@@ -0,0 +1,60 @@
+# startup_check.py
+# ShopImpact - cold-start guard for the Add Purchase page
+#   python startup_check.py            -> exit 1 if the budget is exceeded or a heavy module was loaded
+#   SHOPIMPACT_STARTUP_TARGET=0.8 ...  -> override the budget (seconds)
+
+import json
+import os
+import subprocess
+import sys
+
+# first script run of a fresh worker, excluding the streamlit import itself. about half of it is Streamlit's
+# own first run (~0.35s for an empty script here) and the rest varies by ±0.1s between runs on a busy
+# machine; importing pandas + matplotlib on this path costs more than the remaining headroom
+TARGET_SECONDS = 1.0
+# modules the Add Purchase page must not pull in
+HEAVY_MODULES = ("pandas", "matplotlib")
+
+# runs in a fresh interpreter so nothing is warm; prints one JSON line
+_CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=60)
+started = time.perf_counter()
+app.run()
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "errors": [str(e.value) for e in app.exception],
+                  "loaded": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def measure(app_path="app.py", runs=3):
+    # best of `runs` cold starts (each in its own interpreter)
+    env = dict(os.environ, SHOPIMPACT_STORE="memory")
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _CHILD, app_path, *HEAVY_MODULES], env=env,
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(results, key=lambda r: r["seconds"])
+
+
+def main():
+    target = float(os.environ.get("SHOPIMPACT_STARTUP_TARGET", TARGET_SECONDS))
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    result = measure(app_path)
+    print(f"Add Purchase cold start: {result['seconds']:.3f}s (target {target:.3f}s)")
+    failures = []
+    if result["errors"]:
+        failures.append("app raised: " + "; ".join(result["errors"]))
+    if result["loaded"]:
+        failures.append("heavy modules loaded at startup: " + ", ".join(result["loaded"]))
+    if result["seconds"] > target:
+        failures.append(f"startup {result['seconds']:.3f}s exceeds target {target:.3f}s")
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
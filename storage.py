@@ -0,0 +1,505 @@
+# storage.py
+# ShopImpact - durable local persistence for purchases (SQLite or Parquet snapshots, no outside services)
+
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError
+from contextlib import contextmanager
+
+import cohorts
+from ledger import COLUMNS
+from multipliers import DEFAULT_PROFILE, MultiplierProfile
+
+DEFAULT_BACKEND = "sqlite"
+DEFAULT_SQLITE_PATH = "shopimpact.db"
+DEFAULT_PARQUET_DIR = "shopimpact_store"
+DEFAULT_READERS = 8
+# seconds a session waits for the writer thread before giving up on a write
+WRITE_TIMEOUT = 30.0
+
+
+class StoreError(RuntimeError):
+    # a write that didn't reach the store (failed, or the writer didn't answer within WRITE_TIMEOUT)
+    pass
+
+
+def entry_to_row(entry):
+    return tuple(entry[c] for c in COLUMNS)
+
+
+def _row_to_entry(row):
+    date, product_type, product_name, brand, price, impact, eco_brand, multiplier_version = row
+    return {
+        "date": date,
+        "product_type": product_type,
+        "product_name": product_name,
+        "brand": brand,
+        "price": float(price),
+        "impact": float(impact),
+        "eco_brand": bool(eco_brand),
+        "multiplier_version": multiplier_version,
+    }
+
+
+class PurchaseStore:
+    # backend interface: purchases are plain entry dicts (same shape add_purchase receives)
+    name = "memory"
+
+    def write_many(self, user_id, entries):
+        self.write_rows(user_id, [entry_to_row(e) for e in entries])
+
+    def write_rows(self, user_id, rows):
+        # rows: iterable of tuples in ledger COLUMNS order (date as an ISO string)
+        pass
+
+    def query(self, user_id, start=None, end=None, product_type=None):
+        return [_row_to_entry(r) for r in self.query_rows(user_id, start, end, product_type)]
+
+    def query_rows(self, user_id, start=None, end=None, product_type=None):
+        # tuples in ledger COLUMNS order, sorted by date
+        return []
+
+    # multiplier tables by version, and the table each named profile uses (see multipliers.ProfileRegistry);
+    # the memory store keeps nothing beyond the process
+    def save_profile(self, profile):
+        pass
+
+    def load_profiles(self):
+        return []
+
+    def save_assignment(self, user_id, version):
+        # version None: back to the default multipliers
+        pass
+
+    def load_assignments(self):
+        return {}
+
+    # cross-user rollups (see cohorts.py); only stores shared by every session keep them
+    supports_cohorts = False
+
+    def refresh_rollups(self, batch=None):
+        pass
+
+    def cohort_query(self, query, *args, **kwargs):
+        raise NotImplementedError(f"The {self.name} store keeps no cross-user rollups")
+
+    def close(self):
+        pass
+
+
+# ----------------------
+# SQLite (WAL) backend
+# ----------------------
+# brand names are interned: each purchase stores a brands.id instead of repeating the string
+BRANDS_TABLE = """
+CREATE TABLE IF NOT EXISTS brands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+)
+"""
+PURCHASES_TABLE = """
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    product_type TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    brand_id INTEGER NOT NULL REFERENCES brands(id),
+    price REAL NOT NULL,
+    impact REAL NOT NULL,
+    eco_brand INTEGER NOT NULL,
+    multiplier_version TEXT NOT NULL
+)
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_purchases_user_date ON purchases(user_id, date);
+CREATE INDEX IF NOT EXISTS ix_purchases_user_type ON purchases(user_id, product_type, date);
+"""
+
+PROFILES_TABLES = """
+CREATE TABLE IF NOT EXISTS multiplier_profiles (
+    version TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    multipliers TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS active_profiles (
+    user_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+"""
+
+INSERT_BRAND_SQL = "INSERT OR IGNORE INTO brands (name) VALUES (?)"
+INSERT_SQL = ("INSERT INTO purchases (user_id, date, product_type, product_name, brand_id, price, impact, eco_brand, multiplier_version) "
+              "VALUES (?, ?, ?, ?, (SELECT id FROM brands WHERE name = ?), ?, ?, ?, ?)")
+
+
+def _migrate(conn):
+    # bring databases written by earlier versions up to the current layout
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(purchases)")}
+    if not columns:
+        conn.execute(PURCHASES_TABLE)
+        return
+    if "multiplier_version" not in columns:
+        # purchases from before they recorded their multiplier version
+        with conn:
+            conn.execute("ALTER TABLE purchases ADD COLUMN multiplier_version TEXT NOT NULL "
+                         f"DEFAULT '{DEFAULT_PROFILE.version}'")
+    if "brand" in columns:
+        # purchases from before brand names were interned
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO brands (name) SELECT DISTINCT brand FROM purchases")
+            conn.execute("ALTER TABLE purchases RENAME TO purchases_v1")
+            conn.execute(PURCHASES_TABLE)
+            conn.execute("INSERT INTO purchases (id, user_id, date, product_type, product_name, brand_id, price, impact, "
+                         "eco_brand, multiplier_version) "
+                         "SELECT p.id, p.user_id, p.date, p.product_type, p.product_name, b.id, p.price, p.impact, "
+                         "p.eco_brand, p.multiplier_version FROM purchases_v1 p JOIN brands b ON b.name = p.brand")
+            conn.execute("DROP TABLE purchases_v1")
+
+
+class ConnectionPool:
+    # bounded pool of read-only connections; at most `size` queries run at once
+    def __init__(self, path, size=DEFAULT_READERS):
+        self.uri = pathlib.Path(path).absolute().as_uri() + "?mode=ro"
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class GroupCommitWriter:
+    # one writer thread per process: batches queued by every session while a commit is in flight
+    # are written together in the next transaction
+    def __init__(self, conn, max_batch=1000):
+        self._conn = conn
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self.commits = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="shopimpact-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, params):
+        # params: list of INSERT parameter tuples; the future resolves once they are committed
+        return self._put(params)
+
+    def call(self, fn):
+        # run fn(conn) in its own transaction on the writer thread, ordered with the queued writes
+        return self._put(fn)
+
+    def _put(self, item):
+        future = Future()
+        if not self._thread.is_alive():
+            future.set_exception(StoreError("The store's writer thread has stopped"))
+        else:
+            self._queue.put((item, future))
+        return future
+
+    @staticmethod
+    def wait(future, timeout=WRITE_TIMEOUT):
+        # the future's result; failures and timeouts come back as StoreError
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            raise StoreError(f"The store didn't confirm the write within {timeout:.0f}s") from None
+        except StoreError:
+            raise
+        except Exception as e:
+            raise StoreError(f"Write failed: {e}") from e
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            group = []
+            while item is not None:
+                if callable(item[0]):
+                    if group:
+                        self._commit(group)
+                        group = []
+                    self._call(*item)
+                else:
+                    group.append(item)
+                    if len(group) >= self.max_batch:
+                        self._commit(group)
+                        group = []
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if group:
+                self._commit(group)
+            if item is None:
+                return
+
+    def _call(self, fn, future):
+        try:
+            with self._conn:
+                result = fn(self._conn)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def _insert(self, params):
+        self._conn.executemany(INSERT_BRAND_SQL, {(p[4],) for p in params})
+        self._conn.executemany(INSERT_SQL, params)
+
+    def _commit(self, group):
+        try:
+            with self._conn:
+                for params, _ in group:
+                    self._insert(params)
+        except Exception:
+            # the group was rolled back: retry batch by batch so one bad batch doesn't fail the others.
+            # anything escaping here would end the writer thread and leave every later write waiting
+            for params, future in group:
+                try:
+                    with self._conn:
+                        self._insert(params)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(len(params))
+                self.commits += 1
+        else:
+            for params, future in group:
+                future.set_result(len(params))
+            self.commits += 1
+        self.batches += len(group)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class SQLiteStore(PurchaseStore):
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, readers=DEFAULT_READERS):
+        self.path = path
+        # the write connection belongs to the writer thread once setup is done
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(BRANDS_TABLE)
+        _migrate(conn)
+        conn.executescript(INDEXES)
+        conn.executescript(cohorts.ROLLUP_SCHEMA)
+        conn.executescript(PROFILES_TABLES)
+        self._conn = conn
+        self._writer = GroupCommitWriter(conn)
+        # WAL readers never wait on the writer
+        self._readers = ConnectionPool(path, readers)
+
+    def write_rows(self, user_id, rows):
+        # blocks until the rows are committed (usually together with other sessions' writes)
+        params = [(user_id, d, t, n, b, float(p), float(i), int(bool(e)), v) for d, t, n, b, p, i, e, v in rows]
+        if params:
+            self._writer.wait(self._writer.submit(params))
+
+    def save_profile(self, profile):
+        sql = "INSERT OR IGNORE INTO multiplier_profiles (version, name, multipliers) VALUES (?, ?, ?)"
+        params = (profile.version, profile.name, json.dumps(dict(profile.table)))
+        self._writer.wait(self._writer.call(lambda conn: conn.execute(sql, params)))
+
+    def load_profiles(self):
+        with self._readers.connection() as conn:
+            rows = conn.execute("SELECT name, multipliers FROM multiplier_profiles").fetchall()
+        return [MultiplierProfile(name, json.loads(table)) for name, table in rows]
+
+    def save_assignment(self, user_id, version):
+        if version is None:
+            task = lambda conn: conn.execute("DELETE FROM active_profiles WHERE user_id = ?", (user_id,))
+        else:
+            task = lambda conn: conn.execute("INSERT INTO active_profiles (user_id, version) VALUES (?, ?) "
+                                             "ON CONFLICT (user_id) DO UPDATE SET version = excluded.version", (user_id, version))
+        self._writer.wait(self._writer.call(task))
+
+    def load_assignments(self):
+        with self._readers.connection() as conn:
+            return dict(conn.execute("SELECT user_id, version FROM active_profiles").fetchall())
+
+    supports_cohorts = True
+
+    def refresh_rollups(self, batch=None):
+        # one writer task per step, so queued purchase writes get in between steps of a long backfill
+        batch = batch or cohorts.REFRESH_BATCH
+        while not self._writer.wait(self._writer.call(lambda conn: cohorts.refresh_rollups(conn, batch))):
+            pass
+
+    def cohort_query(self, query, *args, **kwargs):
+        # query: one of the cohorts.py readers, run on a pooled read-only connection
+        with self._readers.connection() as conn:
+            return query(conn, *args, **kwargs)
+
+    def query_rows(self, user_id, start=None, end=None, product_type=None):
+        # every predicate is a prefix/range of one of the (user_id, ...) indexes
+        sql = ("SELECT p.date, p.product_type, p.product_name, b.name, p.price, p.impact, p.eco_brand, p.multiplier_version "
+               "FROM purchases p JOIN brands b ON b.id = p.brand_id WHERE p.user_id = ?")
+        params = [user_id]
+        if product_type is not None:
+            sql += " AND p.product_type = ?"
+            params.append(product_type)
+        if start is not None:
+            sql += " AND p.date >= ?"
+            params.append(str(start))
+        if end is not None:
+            sql += " AND p.date <= ?"
+            params.append(str(end))
+        sql += " ORDER BY p.date, p.id"
+        with self._readers.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self._writer.close()
+        self._readers.close()
+        self._conn.close()
+
+
+# ----------------------
+# Parquet snapshot backend (one file per user, rewritten atomically)
+# ----------------------
+class ParquetStore(PurchaseStore):
+    name = "parquet"
+
+    def __init__(self, directory=DEFAULT_PARQUET_DIR):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("The parquet store needs pyarrow (pip install pyarrow)") from e
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, user_id):
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in user_id) or "guest"
+        return os.path.join(self.directory, f"{safe}.parquet")
+
+    def write_rows(self, user_id, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        columns = list(zip(*rows))
+        if not columns:
+            return
+        path = self._path(user_id)
+        batch = pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(columns, _parquet_schema())],
+                                     schema=_parquet_schema())
+        with self._lock:
+            table = pa.concat_tables([self._read(path), batch]) if os.path.exists(path) else batch
+            table = table.sort_by("date")
+            tmp = path + ".tmp"
+            pq.write_table(table, tmp, row_group_size=64_000)
+            os.replace(tmp, path)
+
+    def _read(self, path, filters=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, filters=filters or None)
+        if "multiplier_version" not in table.column_names:
+            # snapshots written before purchases recorded their multiplier version
+            table = table.append_column("multiplier_version", pa.array([DEFAULT_PROFILE.version] * table.num_rows, pa.string()))
+        return table.select(COLUMNS).cast(_parquet_schema())
+
+    # profiles live next to the snapshots in one JSON file: {"profiles": {version: {...}}, "active": {user: version}}
+    def _profiles_doc(self):
+        path = os.path.join(self.directory, "profiles.json")
+        if not os.path.exists(path):
+            return {"profiles": {}, "active": {}}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _update_profiles(self, change):
+        path = os.path.join(self.directory, "profiles.json")
+        with self._lock:
+            doc = self._profiles_doc()
+            change(doc)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(doc, f, indent=1)
+            os.replace(path + ".tmp", path)
+
+    def save_profile(self, profile):
+        self._update_profiles(lambda doc: doc["profiles"].setdefault(
+            profile.version, {"name": profile.name, "multipliers": dict(profile.table)}))
+
+    def load_profiles(self):
+        with self._lock:
+            profiles = self._profiles_doc()["profiles"]
+        return [MultiplierProfile(p["name"], p["multipliers"]) for p in profiles.values()]
+
+    def save_assignment(self, user_id, version):
+        def change(doc):
+            if version is None:
+                doc["active"].pop(user_id, None)
+            else:
+                doc["active"][user_id] = version
+        self._update_profiles(change)
+
+    def load_assignments(self):
+        with self._lock:
+            return dict(self._profiles_doc()["active"])
+
+    def query_rows(self, user_id, start=None, end=None, product_type=None):
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return []
+        # predicates are pushed down to row-group statistics (file is kept sorted by date)
+        filters = []
+        if product_type is not None:
+            filters.append(("product_type", "=", product_type))
+        if start is not None:
+            filters.append(("date", ">=", str(start)))
+        if end is not None:
+            filters.append(("date", "<=", str(end)))
+        with self._lock:
+            table = self._read(path, filters)
+        return list(zip(*(table.column(c).to_pylist() for c in COLUMNS)))
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("date", pa.string()),
+        ("product_type", pa.string()),
+        ("product_name", pa.string()),
+        ("brand", pa.string()),
+        ("price", pa.float64()),
+        ("impact", pa.float64()),
+        ("eco_brand", pa.bool_()),
+        ("multiplier_version", pa.string()),
+    ])
+
+
+BACKENDS = {
+    "memory": lambda: PurchaseStore(),
+    "sqlite": lambda: SQLiteStore(os.environ.get("SHOPIMPACT_DB_PATH", DEFAULT_SQLITE_PATH),
+                                  int(os.environ.get("SHOPIMPACT_DB_READERS", DEFAULT_READERS))),
+    "parquet": lambda: ParquetStore(os.environ.get("SHOPIMPACT_PARQUET_DIR", DEFAULT_PARQUET_DIR)),
+}
+
+
+def open_store(backend=None):
+    backend = backend or os.environ.get("SHOPIMPACT_STORE", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown store backend {backend!r} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
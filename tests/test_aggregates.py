@@ -0,0 +1,33 @@
+# tests/test_aggregates.py
+# incremental monthly aggregates must agree with the full rebuild and the pandas groupby
+
+import numpy as np
+
+from aggregates import summary_by_month
+from ledger import PurchaseLedger
+
+
+def _random_ledger(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    cats = ["Electronics", "Groceries (Fresh/Local)", "Other"]
+    ledger = PurchaseLedger()
+    for _ in range(n):
+        day = np.datetime64("2022-01-01") + int(rng.integers(0, 1000))
+        price = round(float(rng.uniform(1, 500)), 2)
+        ledger.append({"date": str(day), "product_type": cats[int(rng.integers(0, 3))], "product_name": "item",
+                       "brand": "Brand", "price": price, "impact": round(price * 0.1, 2), "eco_brand": False})
+    return ledger
+
+
+def test_incremental_matches_rebuild():
+    assert _random_ledger().verify_aggregates()
+
+
+def test_incremental_matches_pandas_groupby():
+    ledger = _random_ledger()
+    batch = summary_by_month(ledger.frame())
+    incremental = ledger.monthly.to_frame()
+    assert list(batch["month"]) == list(incremental["month"])
+    assert (batch["count"].to_numpy() == incremental["count"].to_numpy()).all()
+    assert np.allclose(batch["total_spend"], incremental["total_spend"])
+    assert np.allclose(batch["total_impact"], incremental["total_impact"])
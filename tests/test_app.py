@@ -0,0 +1,113 @@
+# tests/test_app.py
+# end-to-end checks through Streamlit's AppTest (sessions in one process share cache_resource, like a server)
+
+import os
+
+import pytest
+from streamlit.runtime.caching import cache_resource
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture()
+def session(request, monkeypatch, tmp_path):
+    # parquet unless the test picks a backend (indirect parametrize)
+    monkeypatch.setenv("SHOPIMPACT_STORE", getattr(request, "param", "parquet"))
+    monkeypatch.setenv("SHOPIMPACT_PARQUET_DIR", str(tmp_path / "store"))
+    monkeypatch.setenv("SHOPIMPACT_DB_PATH", str(tmp_path / "shopimpact.db"))
+    # a fresh store / registry for this test's directory
+    cache_resource.clear()
+
+    def new_session():
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.run()
+        assert not at.exception, at.exception
+        return at
+    yield new_session
+    cache_resource.clear()
+
+
+def _save_multiplier(at, category, value):
+    at.sidebar.radio[0].set_value("Settings & About").run()
+    [n for n in at.number_input if n.label == category][0].set_value(value)
+    [b for b in at.button if b.label == "Save multipliers"][0].click().run()
+    assert not at.exception, at.exception
+
+
+def _add_purchase(at, category, price, brand="Brand"):
+    at.sidebar.radio[0].set_value("Add Purchase").run()
+    at.text_input(key="ap_brand").set_value(brand)
+    at.selectbox(key="ap_prod").set_value(category)
+    at.number_input(key="ap_price").set_value(price)
+    [b for b in at.button if b.label.startswith("Add purchase")][0].click().run()
+    assert not at.exception, at.exception
+    return at.success[0].value
+
+
+def test_guest_multipliers_stay_in_their_session(session):
+    a, b = session(), session()
+    _save_multiplier(a, "Electronics", 0.9)
+    assert "≈ 90.0" in _add_purchase(a, "Electronics", 100.0)
+    assert "≈ 35.0" in _add_purchase(b, "Electronics", 100.0)
+
+
+def test_named_profile_multipliers_are_shared_and_kept(session):
+    a = session()
+    a.sidebar.text_input(key="user_id").set_value("alice").run()
+    _save_multiplier(a, "Electronics", 0.9)
+    cache_resource.clear()  # as after a restart: registry and store are rebuilt from disk
+    b = session()
+    b.sidebar.text_input(key="user_id").set_value("alice").run()
+    assert "≈ 90.0" in _add_purchase(b, "Electronics", 100.0)
+
+
+def _history_text(at):
+    at.sidebar.radio[0].set_value("History & Export").run()
+    assert not at.exception, at.exception
+    return " ".join([str(m.value) for m in at.markdown] + [str(m.value) for m in at.metric]
+                    + [df.value.to_csv() for df in at.dataframe])
+
+
+@pytest.mark.parametrize("session", ["sqlite", "parquet"], indirect=True)
+def test_guest_purchases_stay_in_their_session(session):
+    a = session()
+    _add_purchase(a, "Electronics", 42.0, brand="SecretBrand")
+    assert "SecretBrand" in _history_text(a)
+    b = session()
+    assert len(b.session_state["ledger"]) == 0
+    assert "SecretBrand" not in _history_text(b)
+
+
+@pytest.mark.parametrize("session", ["sqlite", "parquet"], indirect=True)
+def test_named_profile_purchases_are_saved(session):
+    a = session()
+    a.sidebar.text_input(key="user_id").set_value("alice").run()
+    _add_purchase(a, "Electronics", 42.0, brand="AliceBrand")
+    b = session()
+    b.sidebar.text_input(key="user_id").set_value("alice").run()
+    assert len(b.session_state["ledger"]) == 1
+    # back to guest and to alice again within one session: each ledger comes back as it was
+    _add_purchase(b, "Electronics", 10.0, brand="Other")
+    b.sidebar.text_input(key="user_id").set_value("guest").run()
+    _add_purchase(b, "Electronics", 5.0)
+    b.sidebar.text_input(key="user_id").set_value("alice").run()
+    assert len(b.session_state["ledger"]) == 2
+    b.sidebar.text_input(key="user_id").set_value("guest").run()
+    assert len(b.session_state["ledger"]) == 1
+
+
+def test_prepared_export_is_dropped_when_stale(session):
+    at = session()
+    _add_purchase(at, "Electronics", 42.0)
+    at.sidebar.radio[0].set_value("History & Export").run()
+    prepare = lambda: [b for b in at.button if b.label == "Prepare export"][0].click().run()
+    prepare()
+    assert "export" in at.session_state
+    # another format: the csv bytes go at once, not when the next export is prepared
+    [s for s in at.selectbox if s.label == "Format"][0].set_value("jsonl").run()
+    assert "export" not in at.session_state
+    prepare()
+    assert "export" in at.session_state
+    at.sidebar.radio[0].set_value("Dashboard").run()
+    assert "export" not in at.session_state
@@ -0,0 +1,19 @@
+# tests/test_bench.py
+
+from bench.run import compare
+
+
+def _run(case, min_s, median_s=None, rows=1_000):
+    return {"case": case, "rows": rows, "runs": 5, "min_s": min_s, "median_s": median_s or min_s}
+
+
+def test_compare_uses_best_times_and_a_noise_floor():
+    baseline = {"results": [_run("fast", 0.0002), _run("slow", 0.100, 0.110), _run("noisy", 0.100, 0.100)]}
+    results = [
+        _run("fast", 0.0006),          # 3x slower, but only 0.4 ms
+        _run("slow", 0.150, 0.160),    # a real slowdown
+        _run("noisy", 0.101, 0.150),   # median jumped, best time didn't
+        _run("new", 0.5),              # not in the baseline
+    ]
+    assert [(case, rows) for case, rows, *_ in compare(results, baseline, 1.25)] == [("slow", 1_000)]
+    assert [case for case, *_ in compare(results, baseline, 1.25, min_delta=0)] == ["fast", "slow"]
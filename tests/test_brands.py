@@ -0,0 +1,40 @@
+# tests/test_brands.py
+
+import pytest
+
+from brands import load_registry
+
+
+@pytest.fixture()
+def registry():
+    return load_registry()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("h&m", "H&M"), ("HM", "H&M"), ("  coca cola ", "Coca-Cola"), ("Nike Store", "Nike"),
+    ("NESTLÉ", "Nestle"), ("Dr Martens", "Dr. Martens"), ("Corner Shop", None),
+])
+def test_canonical(registry, raw, expected):
+    assert registry.canonical(raw) == expected
+
+
+def test_eco_flags(registry):
+    assert registry.is_eco("patagonia") and not registry.is_eco("Zara")
+
+
+def test_complete(registry):
+    assert registry.complete("pa")[:2] == ["Pact", "Patagonia"]
+    assert registry.complete("") == []
+
+
+def test_add_at_runtime(registry):
+    new_id = registry.add("Corner Shop", eco=True)
+    assert registry.lookup("corner shop ltd") == new_id
+    assert "Corner Shop" in registry.complete("corn")
+    assert registry.add("corner shop") == new_id
+
+
+def test_canonicalize_many(registry):
+    names, eco = registry.canonicalize_many(["patagonia", " corner  shop ", "patagonia"])
+    assert list(names) == ["Patagonia", "corner shop", "Patagonia"]
+    assert list(eco) == [True, False, True]
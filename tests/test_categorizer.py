@@ -0,0 +1,42 @@
+# tests/test_categorizer.py
+
+import numpy as np
+import pytest
+
+from bench.synthetic import generate_columns
+from categorizer import load_index
+from multipliers import MULTIPLIERS
+
+
+@pytest.fixture(scope="module")
+def index():
+    return load_index()
+
+
+def test_every_category_has_a_multiplier(index):
+    assert not set(index.categories) - set(MULTIPLIERS)
+
+
+@pytest.mark.parametrize("name, brand, expected", [
+    ("Running Shoes", "", "Footwear (Synthetic)"),
+    ("Leather Sneakers", "", "Footwear (Leather)"),
+    ("Vintage Jacket", "", "Clothing (Sustainable/Second-Hand)"),
+    ("Cotton T-Shirt", "Zara", "Clothing (Fast Fashion)"),
+    ("Organic apples", "", "Groceries (Fresh/Local)"),
+    ("NIKE STORE 0423", "", "Footwear (Synthetic)"),
+    ("Refurbished laptop", "Back Market", "Electronics"),
+    ("Vintage chair", "", "Furniture"),
+    ("Shampoo bar", "Lush", "Personal Care"),
+    ("Frozen Pizza", "Tesco", "Groceries (Packaged)"),
+    ("Energy drink 4-pack", "", "Beverages (Single-Use Bottle)"),
+    ("Card payment", "", None),
+])
+def test_categorize(index, name, brand, expected):
+    assert index.categorize(name, brand)[0] == expected
+
+
+def test_categorize_many_agrees_with_synthetic_labels(index):
+    cols = generate_columns(20_000, seed=1)
+    cats, confidence = index.categorize_many(cols["product_name"], cols["brand"], default="Other")
+    assert len(cats) == len(confidence) == 20_000
+    assert np.mean(cats == np.asarray(cols["product_type"], dtype=object)) > 0.95
@@ -0,0 +1,54 @@
+# tests/test_cohorts.py
+
+import threading
+
+from bench.synthetic import generate_entries
+from cohorts import brand_ranking, category_leaderboard, rollup_months, user_percentile
+from storage import SQLiteStore, entry_to_row
+
+
+def _recount(conn):
+    return conn.execute("SELECT substr(date, 1, 7), product_type, brand_id, COUNT(*), ROUND(SUM(price), 6), "
+                        "ROUND(SUM(impact), 6) FROM purchases GROUP BY 1, 2, 3 ORDER BY 1, 2, 3").fetchall()
+
+
+def _rolled(conn):
+    return conn.execute("SELECT month, product_type, brand_id, purchases, ROUND(spend, 6), ROUND(impact, 6) "
+                        "FROM rollup_month_category_brand ORDER BY 1, 2, 3").fetchall()
+
+
+def test_incremental_rollups_match_full_recount(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cohorts.db"))
+    entries = [entry_to_row(e) for e in generate_entries(30_000, seed=3)]
+    # three rounds of writes with refreshes in between; the small batch forces several steps per refresh
+    for start in range(0, len(entries), 10_000):
+        for user in range(25):
+            store.write_rows(f"user-{user}", entries[start + user * 400:start + (user + 1) * 400])
+        store.refresh_rollups(batch=3_000)
+    with store._readers.connection() as conn:
+        assert _recount(conn) == _rolled(conn)
+        month = conn.execute("SELECT MAX(month) FROM rollup_user_month WHERE user_id = 'user-0'").fetchone()[0]
+        assert month in rollup_months(conn)
+        share, shoppers = user_percentile(conn, "user-0", month)
+        assert 0 <= share < 1 and shoppers >= 1
+        assert user_percentile(conn, "nobody", month) is None
+        assert category_leaderboard(conn, month)
+        assert len(brand_ranking(conn, order="intensity", limit=3)) == 3
+    store.close()
+
+
+def test_concurrent_refreshes_fold_each_purchase_once(tmp_path):
+    # two stores on one file stand in for two server processes refreshing at the same time
+    path = str(tmp_path / "shared.db")
+    stores = [SQLiteStore(path), SQLiteStore(path)]
+    entries = [entry_to_row(e) for e in generate_entries(5_000, seed=5)]
+    stores[0].write_rows("user-0", entries)
+    threads = [threading.Thread(target=store.refresh_rollups, kwargs={"batch": 250}) for store in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with stores[0]._readers.connection() as conn:
+        assert _recount(conn) == _rolled(conn)
+    for store in stores:
+        store.close()
@@ -0,0 +1,77 @@
+# tests/test_importer.py
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from importer import import_purchases, parse_amounts, parse_dates
+from ledger import PurchaseLedger
+from multipliers import DEFAULT_PROFILE
+
+
+def _jsonl(rows):
+    return io.StringIO("".join(json.dumps(r) + "\n" for r in rows))
+
+
+def _import(source, fmt="jsonl", **kwargs):
+    ledger = PurchaseLedger()
+    result = import_purchases(ledger, source, DEFAULT_PROFILE, fmt=fmt, **kwargs)
+    return ledger, result
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("12,50", 12.5), ("1.234,56", 1234.56), ("1,250", 1250.0), ("$1,250.00", 1250.0), ("€ 3,99", 3.99),
+    ("(12.50)", -12.5), ("-45.10", -45.1), (7, 7.0),
+])
+def test_parse_amounts(raw, expected):
+    assert parse_amounts(pd.Series([raw], dtype=object)).iloc[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("raw", ["12,5,0", "abc", None])
+def test_parse_amounts_rejects(raw):
+    assert np.isnan(parse_amounts(pd.Series([raw], dtype=object)).iloc[0])
+
+
+def test_decimal_comma_price_is_not_inflated():
+    ledger, result = _import(_jsonl([{"date": "2024-03-05", "brand": "Zara", "price": "12,50"}]))
+    assert result.rows_added == 1 and ledger.column("price")[0] == pytest.approx(12.5)
+
+
+def test_credits_are_skipped_not_flipped():
+    rows = [{"date": "2024-03-05", "brand": "Tesco", "price": -20.0},
+            {"date": "2024-03-06", "brand": "Employer", "price": 2500.0}]
+    ledger, result = _import(_jsonl(rows), debits="negative")
+    assert result.rows_added == 1 and list(ledger.column("price")) == [20.0]
+    assert "refund" in result.errors[0][1]
+    ledger, result = _import(_jsonl(rows), debits="positive")
+    assert list(ledger.column("price")) == [2500.0] and result.error_count == 1
+
+
+def test_unknown_debit_sign():
+    with pytest.raises(ValueError):
+        _import(_jsonl([]), debits="both")
+
+
+def test_mixed_timezones_do_not_abort():
+    # near midnight the UTC day differs from the one written down: the written (local) date wins,
+    # so purchases don't move into the neighbouring month
+    rows = [{"date": "2024-03-31T22:30:00-05:00", "brand": "Zara", "price": 1},
+            {"date": "2024-04-01T00:30:00+02:00", "brand": "Zara", "price": 1},
+            {"date": "2024-03-07", "brand": "Zara", "price": 1},
+            {"date": "Sun, 31 Mar 2024 23:45:00 -0500", "brand": "Zara", "price": 1},
+            {"date": "not a date", "brand": "Zara", "price": 1}]
+    ledger, result = _import(_jsonl(rows))
+    assert list(np.datetime_as_string(ledger.column("date"))) == ["2024-03-31", "2024-04-01", "2024-03-07", "2024-03-31"]
+    assert [row for row, _ in result.errors] == [5]
+
+
+def test_day_first_dates():
+    csv = io.StringIO("date,brand,price\n05/03/2024,Zara,1\n13/03/2024,Zara,2\n2024-03-20,Zara,3\n")
+    ledger, result = _import(csv, fmt="csv", dayfirst=True)
+    assert list(np.datetime_as_string(ledger.column("date"))) == ["2024-03-05", "2024-03-13", "2024-03-20"]
+    # read month-first, 13/03 is not a date and is reported for its row
+    parsed = parse_dates(pd.Series(["05/03/2024", "13/03/2024"], dtype=object))
+    assert parsed.iloc[0] == pd.Timestamp("2024-05-03") and pd.isna(parsed.iloc[1])
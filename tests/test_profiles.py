@@ -0,0 +1,43 @@
+# tests/test_profiles.py
+
+import pytest
+
+from multipliers import DEFAULT_PROFILE, ProfileRegistry
+from storage import ParquetStore, PurchaseStore, SQLiteStore
+
+
+@pytest.fixture(params=["sqlite", "parquet"])
+def reopen(request, tmp_path):
+    # factory for a store on the same files, as after a server restart
+    stores = []
+
+    def open_():
+        store = SQLiteStore(str(tmp_path / "p.db")) if request.param == "sqlite" else ParquetStore(str(tmp_path / "pq"))
+        stores.append(store)
+        return store
+    yield open_
+    for store in stores:
+        store.close()
+
+
+def test_profiles_and_assignments_survive_a_restart(reopen):
+    registry = ProfileRegistry(reopen())
+    custom = DEFAULT_PROFILE.with_overrides({"Electronics": 0.9}, name="Custom")
+    guest_table = DEFAULT_PROFILE.with_overrides({"Furniture": 0.5}, name="Custom")
+    registry.assign("alice", custom)
+    registry.register(guest_table)
+    registry.assign("bob", custom)
+    registry.assign("bob", DEFAULT_PROFILE)
+
+    restarted = ProfileRegistry(reopen())
+    assert restarted.get(custom.version).table["Electronics"] == 0.9
+    assert restarted.get(guest_table.version) is not None
+    assert restarted.active_for("alice").version == custom.version
+    assert restarted.active_for("bob") is DEFAULT_PROFILE
+
+
+def test_memory_store_keeps_profiles_in_process_only():
+    registry = ProfileRegistry(PurchaseStore())
+    custom = registry.assign("alice", DEFAULT_PROFILE.with_overrides({"Electronics": 0.9}))
+    assert registry.active_for("alice") is custom
+    assert ProfileRegistry(PurchaseStore()).get(custom.version) is None
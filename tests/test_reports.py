@@ -0,0 +1,80 @@
+# tests/test_reports.py
+
+import sys
+import time
+import types
+import warnings
+
+import pytest
+
+from bench.synthetic import generate_entries
+from ledger import HistoryFilter, PurchaseLedger
+from reports import MAX_CATEGORIES, MAX_MONTHS, PAGES, REPORT_FORMATS, ReportService, render_report, report_payload
+
+
+@pytest.fixture(scope="module")
+def payload():
+    ledger = PurchaseLedger()
+    ledger.extend(generate_entries(20_000, seed=4))
+    return report_payload(ledger, HistoryFilter(), lambda impact: ("Badge", "Message"))
+
+
+def _wait(service, key):
+    status, value = service.poll(key)
+    while status == "running":
+        time.sleep(0.05)
+        status, value = service.poll(key)
+    return status, value
+
+
+def test_payload_is_capped(payload):
+    assert len(payload["months"]) <= MAX_MONTHS and len(payload["categories"]) <= MAX_CATEGORIES
+
+
+def test_renders_both_formats_in_the_pool(payload):
+    service = ReportService()
+    try:
+        keys = {fmt: service.submit(payload, fmt) for fmt in REPORT_FORMATS}
+        assert service.submit(payload, "pdf") == keys["pdf"]
+        pdf, png = _wait(service, keys["pdf"]), _wait(service, keys["png"])
+        assert pdf[0] == "done" and pdf[1].startswith(b"%PDF") and f"/Count {len(PAGES)}".encode() in pdf[1]
+        assert png[0] == "done" and png[1].startswith(b"\x89PNG")
+    finally:
+        service.close()
+
+
+def test_size_budget(payload):
+    service = ReportService(max_bytes=1_000)
+    try:
+        status, message = _wait(service, service.submit(payload, "pdf"))
+        assert status == "failed" and "budget" in message
+    finally:
+        service.close()
+
+
+def test_badge_emoji_are_left_out_of_reports():
+    ledger = PurchaseLedger()
+    ledger.extend(generate_entries(500, seed=6))
+    payload = report_payload(ledger, HistoryFilter(), lambda impact: ("Eco Saver — Neon Leaf", "Tiny footprint! Exceptional 🌿"))
+    assert {badge[2:] for badge in payload["badges"]} == {("Eco Saver — Neon Leaf", "Tiny footprint! Exceptional")}
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        render_report(payload, "pdf")
+    assert not [w for w in caught if "missing from font" in str(w.message)]
+
+
+def test_workers_do_not_rerun_the_main_script(payload, tmp_path, monkeypatch):
+    # under Streamlit __main__ is app.py; a spawned worker must not execute it again
+    marker = tmp_path / "imported"
+    script = tmp_path / "app.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", main)
+    service = ReportService(workers=1)
+    try:
+        assert _wait(service, service.submit(payload, "png"))[0] == "done"
+    finally:
+        service.close()
+    assert sys.modules["__main__"] is main
+    assert not marker.exists()
@@ -0,0 +1,70 @@
+# tests/test_simulator.py
+
+import time
+
+import numpy as np
+
+from bench.synthetic import generate_entries
+from ledger import PurchaseLedger
+from multipliers import DEFAULT_PROFILE
+from simulator import CATEGORIES, Scenario, cut, simulate, substitute
+
+FAST = "Clothing (Fast Fashion)"
+SECOND_HAND = "Clothing (Sustainable/Second-Hand)"
+
+
+def _tiny_ledger():
+    ledger = PurchaseLedger()
+    ledger.append({"date": "2024-05-10", "product_type": FAST, "product_name": "Tee", "brand": "Zara",
+                   "price": 100.0, "impact": 12.0, "eco_brand": False, "multiplier_version": DEFAULT_PROFILE.version})
+    return ledger
+
+
+def test_exact_projection():
+    # one month, 100 spent on fast fashion (0.12): half moved to second-hand (0.03) saves 4.5 a month
+    ledger = _tiny_ledger()
+    half = substitute(FAST, SECOND_HAND, 0.5)
+    result = simulate(ledger, DEFAULT_PROFILE, [half, cut(FAST, 0.5)])
+    assert np.isclose(result.savings[0], 4.5 * 12) and np.isclose(result.savings[1], 6.0 * 12)
+    assert result.low[0] < result.savings[0] < result.high[0]
+    baseline, projected = result.monthly(half)
+    assert np.allclose(baseline, [12.0]) and np.allclose(projected, [7.5])
+
+
+def test_memoised_per_ledger_version():
+    ledger = _tiny_ledger()
+    scenarios = [substitute(FAST, SECOND_HAND, 0.5)]
+    result = simulate(ledger, DEFAULT_PROFILE, scenarios)
+    assert simulate(ledger, DEFAULT_PROFILE, scenarios) is result
+    ledger.append({"date": "2024-05-11", "product_type": FAST, "product_name": "Tee", "brand": "Zara",
+                   "price": 10.0, "impact": 1.2, "eco_brand": False, "multiplier_version": DEFAULT_PROFILE.version})
+    assert simulate(ledger, DEFAULT_PROFILE, scenarios) is not result
+
+
+def test_thousands_of_scenarios_well_under_a_second():
+    ledger = PurchaseLedger()
+    ledger.extend(generate_entries(50_000, seed=5))
+    rng = np.random.default_rng(1)
+    many = [Scenario(f"random {i}", tuple((CATEGORIES[s], CATEGORIES[t] if t < len(CATEGORIES) else None, f)
+                                          for s, t, f in zip(rng.choice(len(CATEGORIES), 2, replace=False),
+                                                             rng.integers(0, len(CATEGORIES) + 1, 2), rng.uniform(0, 0.5, 2))))
+            for i in range(5_000)]
+    started = time.perf_counter()
+    result = simulate(ledger, DEFAULT_PROFILE, many)
+    assert time.perf_counter() - started < 1.0
+    assert len(result.savings) == len(many)
+    assert simulate(ledger, DEFAULT_PROFILE).top(1)
+
+
+def test_no_projection_from_too_little_history():
+    # a single first purchase is one month of data: nothing to scale to a year yet
+    ledger = _tiny_ledger()
+    result = simulate(ledger, DEFAULT_PROFILE)
+    assert result.history_months == 1 and not result.enough_history
+    for month in ("2024-06-02", "2024-07-20"):
+        ledger.append({"date": month, "product_type": FAST, "product_name": "Tee", "brand": "Zara", "price": 20.0,
+                       "impact": 2.4, "eco_brand": False, "multiplier_version": DEFAULT_PROFILE.version})
+    result = simulate(ledger, DEFAULT_PROFILE)
+    assert result.history_months == 3 and result.enough_history
+    # three months of spend (140 on fast fashion at 0.12) scaled by 12 / 3
+    assert np.isclose(result.annual_impact, 140 * 0.12 * 4)
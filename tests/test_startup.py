@@ -0,0 +1,17 @@
+# tests/test_startup.py
+
+import os
+
+import pytest
+
+import startup_check
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.mark.slow
+def test_add_purchase_cold_start_stays_light():
+    result = startup_check.measure(APP)
+    assert not result["errors"]
+    assert not result["loaded"], "heavy modules loaded at startup"
+    assert result["seconds"] <= startup_check.TARGET_SECONDS
@@ -0,0 +1,35 @@
+# tests/test_storage.py
+
+import threading
+
+import pytest
+
+from bench.synthetic import generate_entries
+from storage import GroupCommitWriter, SQLiteStore, StoreError, entry_to_row
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.db"))
+    yield store
+    store.close()
+
+
+def test_writer_survives_a_non_sqlite_error(store):
+    rows = [entry_to_row(e) for e in generate_entries(10, seed=1)]
+    bad = store._writer.submit([("too", "short")])  # IndexError inside the insert, not a sqlite3.Error
+    with pytest.raises(StoreError):
+        GroupCommitWriter.wait(bad)
+    store.write_rows("alice", rows)
+    assert len(store.query_rows("alice")) == len(rows)
+
+
+def test_write_wait_times_out(store):
+    release = threading.Event()
+    stuck = store._writer.call(lambda conn: release.wait(5))
+    try:
+        with pytest.raises(StoreError, match="within"):
+            GroupCommitWriter.wait(stuck, timeout=0.1)
+    finally:
+        release.set()
+    assert GroupCommitWriter.wait(stuck) is True
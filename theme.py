@@ -0,0 +1,223 @@
+# theme.py
+# ShopImpact - neon page themes and their precompiled, memoized CSS
+
+# different neon palettes per page (animated gradients)
+NEON_THEMES = {
+    "Add Purchase": {
+        "name": "Magenta-Violet",
+        "gradients": [
+            ("#ff007f", "#7c4dff"),
+            ("#ff5f7e", "#8a2be2"),
+            ("#ff007f", "#00e5ff")
+        ],
+        "floating": ["#ff007f","#7c4dff","#00e5ff"]
+    },
+    "Dashboard": {
+        "name": "Electric Green",
+        "gradients": [
+            ("#001f3f", "#004d7a"),
+            ("#39ff14", "#0ff0fc"),
+            ("#00ffaa", "#39ff14")
+        ],
+        "floating": ["#39ff14","#00ffaa","#0ff0fc"]
+    },
+    "History & Export": {
+        "name": "Hot Neon",
+        "gradients": [
+            ("#2b0032", "#6a0572"),
+            ("#ff073a", "#ff6ec7"),
+            ("#ff9b00", "#ff073a")
+        ],
+        "floating": ["#ff073a","#ff6ec7","#ff9b00"]
+    },
+    "Settings & About": {
+        "name": "Calm Neon",
+        "gradients": [
+            ("#011627", "#2f3c7e"),
+            ("#ffd400", "#ff6b6b"),
+            ("#7bffb2", "#ffd400")
+        ],
+        "floating": ["#ffd400","#ff6b6b","#7bffb2"]
+    }
+}
+
+# ----------------------
+# CSS: full-screen animated backgrounds, subtle fade-in transitions, full-screen pulse & floats
+# ----------------------
+# theme-independent rules, shared by every compiled stylesheet
+BASE_CSS = """
+
+    /* make Streamlit main app full-bleed and remove default padding */
+    .stApp {
+      padding: 0 !important;
+      margin: 0 !important;
+    }
+    /* top-level page container fills viewport */
+    .page-wrap {
+      min-height: 100vh;
+      width: 100%;
+      position: relative;
+      overflow: auto;
+      display: flex;
+      flex-direction: column;
+      z-index: 1;
+    }
+    /* subtle fade-in when page loads */
+    .page-content {
+      position: relative;
+      z-index: 2;
+      padding: 28px 40px;
+      animation: pageFade 0.9s ease-in-out both;
+    }
+    @keyframes pageFade {
+      0% { opacity: 0; transform: translateY(10px); filter: blur(3px); }
+      100% { opacity: 1; transform: translateY(0); filter: blur(0); }
+    }
+
+    /* full-screen pulse overlay used on add */
+    .neon-pulse-full {
+      position: fixed;
+      inset: 0;
+      z-index: 3;
+      display: none;
+      pointer-events: none;
+      mix-blend-mode: screen;
+    }
+    .neon-pulse-full.active {
+      display: block;
+      animation: fullPulse 1s ease-out 1;
+      background: radial-gradient(circle at 50% 40%, rgba(255,255,255,0.06), rgba(255,255,255,0) 20%),
+                  radial-gradient(circle at 10% 80%, rgba(255,255,255,0.02), rgba(255,255,255,0) 10%);
+    }
+    @keyframes fullPulse {
+      0% { opacity: 0; filter: blur(0); transform: scale(1); }
+      30% { opacity: 1; filter: blur(6px); transform: scale(1.015); }
+      100% { opacity: 0; filter: blur(0); transform: scale(1); }
+    }
+
+    /* floating icons across full viewport */
+    .float-layer {
+      position: fixed;
+      inset: 0;
+      z-index: 4;
+      pointer-events: none;
+      overflow: visible;
+    }
+    /* each icon's spot, delay, speed and size come from its position in the layer: the 2n / 3n / 5n
+       patterns below combine into 30 distinct slots, so the markup carries no per-item styles */
+    .float-layer > i {
+      position: absolute;
+      bottom: 10vh;
+      left: calc(var(--p) * 47% + var(--q) * 16% + var(--r) * 3% + var(--o, 0%));
+      font-size: calc(28px + var(--q) * 8px + var(--r) * 2px + var(--p) * 4px);
+      font-style: normal;
+      text-shadow: 0 6px 18px rgba(0,0,0,0.6);
+      animation: floatUpViewport linear forwards;
+      animation-delay: calc(var(--q) * 0.27s + var(--r) * 0.1s);
+      animation-duration: calc(3.6s + var(--r) * 0.3s + var(--p) * 0.2s);
+      will-change: transform, opacity;
+    }
+    .float-layer > i:nth-child(2n+1) { --p: 0; }
+    .float-layer > i:nth-child(2n) { --p: 1; }
+    .float-layer > i:nth-child(3n+1) { --q: 0; }
+    .float-layer > i:nth-child(3n+2) { --q: 2; }
+    .float-layer > i:nth-child(3n) { --q: 1; }
+    .float-layer > i:nth-child(5n+1) { --r: 3; }
+    .float-layer > i:nth-child(5n+2) { --r: 0; }
+    .float-layer > i:nth-child(5n+3) { --r: 4; }
+    .float-layer > i:nth-child(5n+4) { --r: 1; }
+    .float-layer > i:nth-child(5n) { --r: 2; }
+    @keyframes floatUpViewport {
+      0% { transform: translateY(40vh) scale(0.9); opacity: 1; }
+      100% { transform: translateY(-30vh) scale(1.1); opacity: 0; }
+    }
+
+    /* basic card styling on top content to keep text readable */
+    .card {
+      background: rgba(0,0,0,0.22);
+      border-radius: 12px;
+      padding: 16px;
+      border: 1px solid rgba(255,255,255,0.06);
+      box-shadow: 0 8px 30px rgba(0,0,0,0.45);
+      color: white;
+    }
+    .title {
+      font-size: 40px;
+      font-weight: 900;
+      color: white;
+      text-shadow: 0 0 14px rgba(255,255,255,0.06);
+    }
+    .subtitle {
+      font-size: 16px;
+      color: rgba(255,255,255,0.9);
+      margin-bottom: 8px;
+    }
+    .big-input { font-size:18px; padding:10px; border-radius:8px; border:1px solid rgba(255,255,255,0.08); background: rgba(255,255,255,0.02); color: #fff; width:100%; }
+    .big-button { font-size:18px; padding:10px 18px; border-radius:10px; border:none; cursor:pointer; background: rgba(255,255,255,0.96); color: #111; font-weight:700; box-shadow: 0 10px 30px rgba(0,0,0,0.45); }
+    /* small responsive tweaks */
+    @media (max-width: 800px) {
+      .page-content { padding: 18px 14px; }
+      .title { font-size: 32px; }
+      .float-layer > i { font-size: 26px; }
+    }
+    /* visitors who ask their OS for less motion get a still page */
+    @media (prefers-reduced-motion: reduce) {
+      .float-layer, .neon-pulse-full { display: none !important; }
+      .neon-bg, .page-content { animation: none !important; }
+    }
+"""
+
+# appended when the in-app "Reduced motion" switch is on
+REDUCED_MOTION_CSS = """
+    .float-layer, .neon-pulse-full { display: none !important; }
+    .neon-bg, .page-content { animation: none !important; }
+"""
+
+# per-theme background layer; filled with str.format, so literal braces are doubled
+BACKGROUND_CSS = """
+    /* animated neon background layer (full-screen) */
+    .neon-bg {{
+      position: fixed;
+      inset: 0;
+      z-index: 0;
+      filter: contrast(1.05) saturate(1.2);
+      background: linear-gradient(120deg, {g0[0]}, {g0[1]});
+      background-size: 400% 400%;
+      animation: neonBackground 18s linear infinite;
+      opacity: 0.95;
+      pointer-events: none;
+    }}
+    @keyframes neonBackground {{
+      0% {{ background: linear-gradient(120deg, {g0[0]}, {g0[1]}); }}
+      33% {{ background: linear-gradient(120deg, {g1[0]}, {g1[1]}); }}
+      66% {{ background: linear-gradient(120deg, {g2[0]}, {g2[1]}); }}
+      100% {{ background: linear-gradient(120deg, {g0[0]}, {g0[1]}); }}
+    }}
+"""
+
+# compiled <style> blocks, one per (theme name, reduced motion), built on first use for the life of the process
+_CSS_CACHE = {}
+
+
+def compile_theme_css(theme, reduced=False):
+    grads = theme['gradients']
+    background = BACKGROUND_CSS.format(g0=grads[0], g1=grads[1 % len(grads)], g2=grads[2 % len(grads)])
+    # floating icon colours cycle through the theme palette by position
+    colors = theme['floating']
+    floats = "".join(f"\n    .float-layer > i:nth-child({len(colors)}n+{k + 1}) {{ color: {c}; }}" for k, c in enumerate(colors))
+    return "<style>" + background + BASE_CSS + floats + (REDUCED_MOTION_CSS if reduced else "\n") + "</style>"
+
+
+def page_css(theme_name, reduced=False):
+    css = _CSS_CACHE.get((theme_name, reduced))
+    if css is None:
+        theme = NEON_THEMES.get(theme_name, list(NEON_THEMES.values())[0])
+        css = _CSS_CACHE[(theme_name, reduced)] = compile_theme_css(theme, reduced)
+    return css
+
+
+def register_theme(theme_name, theme):
+    # add or replace one theme; only its own compiled CSS is invalidated
+    NEON_THEMES[theme_name] = theme
+    _CSS_CACHE.pop((theme_name, False), None)
+    _CSS_CACHE.pop((theme_name, True), None)